@@ -0,0 +1,137 @@
+#benchmarks for the pyconformap module, run with: python benchmark_pyconformap.py {stages,backends}
+#synthetic GW reference and protein/polymer data are generated, so no input files are needed
+#  stages   - wall time (optionally peak memory) of every stage of PyConforMap (loading, organize_data, trees,
+#             fC, boundary check, fC curves, GW regeneration, plotting), recorded with its instrumentation
+#  backends - 'kdtree' against 'grid' coverage search across radii and data sizes
+
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from scipy import spatial
+import pyconformap as pcm
+
+
+def synthetic_reference(n_GW,chain_length=20,seed=0):
+    #GWReference of n_GW simulated GW snapshots (a short chain keeps the simulation fast)
+    Rg2,Rend2 = pcm.generate_GW_snapshots(chain_length,n_GW,seed=seed)
+    return pcm.GWReference(pcm.GW_dataframe(chain_length,Rg2,Rend2))
+
+
+def synthetic_protein(n_snapshots,chain_length=20,seed=1):
+    #Rg2 and Ree2 arrays of a chain that gets more compact over the 'trajectory', so that it covers
+    #only part of the GW map
+    rng = np.random.default_rng(seed)
+    scale = np.linspace(0.5,1.2,n_snapshots)[:,None,None]
+    positions = np.zeros((n_snapshots,chain_length,3))
+    np.cumsum(rng.normal(size=(n_snapshots,chain_length-1,3))*scale,axis=1,out=positions[:,1:,:])
+    return pcm.conformation_rg2_ree2(positions)
+
+
+def benchmark_fC_backends(GW_sizes=(100000,720000),protein_sizes=(1000,10000,100000),
+                          radii=(0.05,0.1,0.2),repeats=3):
+    #times the 'kdtree' and 'grid' backends of the fC and bounded-fraction searches (best of repeats),
+    #checking that both give the same result
+    rows = []
+    for n_GW in GW_sizes:
+        reference = synthetic_reference(n_GW)
+        tree_GW = reference.tree(n_GW)
+        for n_protein in protein_sizes:
+            rg2,ree2 = synthetic_protein(n_protein)
+            protein_rg_mean = np.mean(rg2**0.5)
+            protein_points = pcm.transform_protein_data(rg2,ree2,protein_rg_mean,reference.GW_mean,reference.GW_std)
+            tree_protein = spatial.cKDTree(protein_points)
+            for radius_ in radii:
+                row = {'n_GW':n_GW,'n_protein':n_protein,'radius_':radius_}
+                results = {}
+                for backend,function in [('kdtree',pcm.points_within_radius),('grid',pcm.points_within_radius_grid)]:
+                    timings = []
+                    for _ in range(repeats):
+                        start = time.perf_counter()
+                        GW_in_range = function(tree_protein,reference.GW_points,radius_)
+                        protein_in_range = function(tree_GW,protein_points,radius_)
+                        timings.append(time.perf_counter()-start)
+                    results[backend] = (GW_in_range,protein_in_range)
+                    row[f'{backend}_s'] = min(timings)
+                row['fC'] = np.count_nonzero(results['kdtree'][0])/n_GW
+                row['same_result'] = (np.array_equal(results['kdtree'][0],results['grid'][0]) and
+                                      np.array_equal(results['kdtree'][1],results['grid'][1]))
+                rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def write_synthetic_inputs(directory,n_GW,n_protein,GW_format='binary',seed=0):
+    #writes a synthetic GW reference (csv or binary) and protein/polymer csv file, returns their paths
+    reference = synthetic_reference(n_GW,seed=seed)
+    if GW_format=='csv':
+        GW_file = os.path.join(directory,'GW_synthetic.csv')
+        reference.GW_df.to_csv(GW_file,index=False)
+    else:
+        GW_file = os.path.join(directory,'GW_synthetic.gwref')
+        pcm.save_GW_reference_binary(reference,GW_file)
+    rg2,ree2 = synthetic_protein(n_protein,seed=seed+1)
+    protein_file = os.path.join(directory,'protein_synthetic.csv')
+    pd.DataFrame({'Rg2':rg2,'Ree2':ree2}).to_csv(protein_file,index=False)
+    return GW_file,protein_file
+
+
+def benchmark_stages(GW_sizes=(10000,100000,720000),protein_sizes=(10000,),GW_format='binary',
+                     plot_mode='density',regenerate_snapshots=100000,instrument='time'):
+    #runs the main PyConforMap stages on synthetic data of every size with instrumentation on, and returns
+    #one row per recorded stage (nested stages, e.g. organize_data inside fC_using_cdist, have depth > 0)
+    #instrument='memory' also records peak memory, but the wall times are then inflated by tracemalloc,
+    #so time and memory are best measured in separate runs
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    rows = []
+    for n_GW in GW_sizes:
+        for n_protein in protein_sizes:
+            with tempfile.TemporaryDirectory() as directory:
+                GW_file,protein_file = write_synthetic_inputs(directory,n_GW,n_protein,GW_format)
+                #a cold start: the GW reference is not in the cache yet
+                pcm._GW_reference_cache.clear()
+                conformap = pcm.PyConforMap(protein_file,GW_file=GW_file,instrument=instrument)
+                conformap.fC_using_cdist(conformap.upto_protein_snapshots,conformap.GW_every_ith_snap)
+                conformap.fC_using_cdist(conformap.upto_protein_snapshots,conformap.GW_every_ith_snap,method='grid')
+                conformap.fC_vs_radius([0.05,0.1,0.2])
+                conformap.vary_GW_ref('synthetic')
+                conformap.vary_protein('synthetic')
+                conformap.plot_protein_against_GW('synthetic',mode=plot_mode,
+                                                  save_to=os.path.join(directory,'plot.png'))
+                conformap.regenerate_GW_chain(20,regenerate_snapshots,seed=0)
+                plt.close('all')
+                for record in conformap.stage_timings:
+                    rows.append({'n_GW':n_GW,'n_protein':n_protein,**record})
+    return pd.DataFrame(rows)
+
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description='benchmarks for the pyconformap module')
+    subparsers = parser.add_subparsers(dest='benchmark',required=True)
+    stages_parser = subparsers.add_parser('stages',help='wall time (and with --memory peak memory) of every PyConforMap stage')
+    stages_parser.add_argument('--GW-sizes',type=int,nargs='+',default=[10000,100000,720000])
+    stages_parser.add_argument('--protein-sizes',type=int,nargs='+',default=[10000])
+    stages_parser.add_argument('--GW-format',choices=['csv','binary'],default='binary')
+    stages_parser.add_argument('--plot-mode',choices=['scatter','rasterized','density'],default='density')
+    stages_parser.add_argument('--regenerate-snapshots',type=int,default=100000)
+    stages_parser.add_argument('--memory',action='store_true',
+                               help='also trace peak memory (slows the stages down, so wall times are inflated)')
+    stages_parser.add_argument('--output',help='also write the results to this csv file')
+    backends_parser = subparsers.add_parser('backends',help="'kdtree' against 'grid' coverage search")
+    backends_parser.add_argument('--GW-sizes',type=int,nargs='+',default=[100000,720000])
+    backends_parser.add_argument('--protein-sizes',type=int,nargs='+',default=[1000,10000,100000])
+    backends_parser.add_argument('--radii',type=float,nargs='+',default=[0.05,0.1,0.2])
+    backends_parser.add_argument('--repeats',type=int,default=3)
+    backends_parser.add_argument('--output',help='also write the results to this csv file')
+    args = parser.parse_args()
+    if args.benchmark=='stages':
+        results = benchmark_stages(args.GW_sizes,args.protein_sizes,args.GW_format,args.plot_mode,
+                                   args.regenerate_snapshots,'memory' if args.memory else 'time')
+    else:
+        results = benchmark_fC_backends(args.GW_sizes,args.protein_sizes,args.radii,args.repeats)
+    print(results.to_string(index=False))
+    if args.output is not None:
+        results.to_csv(args.output,index=False)
@@ -1,14 +1,101 @@
 #these packages are needed to run the code 
+#matplotlib and more_itertools are only needed for plotting, and are imported by the plotting methods
+#(see _plotting_modules), so that computing fC without plots does not pay for them
 
 import pandas as pd
 import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
 from scipy import spatial
 from itertools import chain
-from more_itertools import sliced
-from matplotlib.ticker import MaxNLocator
-import random as rd
+import os
+import sys
+import json
+import hashlib
+import tempfile
+import zipfile
+import time
+import tracemalloc
+import functools
+from contextlib import contextmanager
+from collections import OrderedDict, deque
+from statistics import NormalDist
+
+#the default reference GW chain file (must be available in the current directory)
+DEFAULT_GW_FILE = 'GW_chainlen100.csv'
+
+#number of GW reference files kept in memory (standardized points and trees) by load_GW_reference
+GW_CACHE_SIZE = 4
+
+#number of KD-trees (one per GW prefix length) kept per GW reference
+GW_TREE_CACHE_SIZE = 4
+
+_GW_reference_cache = OrderedDict()
+
+#number of GW snapshots generated per batch by generate_GW_snapshots (bounds memory use)
+#each batch has its own random stream, so a seeded simulation is reproduced for the same seed and batch size
+GW_BATCH_SIZE = 10000
+
+#largest grid (number of cells) for which points_within_radius_grid uses a dense cell lookup table
+GRID_MAX_CELLS = 2**24
+
+#number of KD-trees (one per protein/polymer prefix length) kept per PyConforMap instance
+PROTEIN_TREE_CACHE_SIZE = 4
+
+#number of protein/polymer snapshots read at a time by iter_protein_chunks (and stream_score_protein)
+#measured on a 720,000-point GW reference with about 2,500 GW points within radius_ 0.1 of each snapshot,
+#a chunk adds about 95 MB on top of the GW reference and its tree (about 155 MB), and 50,000 was the
+#fastest of 10,000-200,000
+PROTEIN_CHUNK_SIZE = 50000
+
+#binary GW reference format: magic bytes, little-endian uint64 header length, JSON header, then data blocks
+#starting at multiples of GW_BINARY_ALIGN bytes (see save_GW_reference_binary)
+GW_BINARY_MAGIC = b'PYCMGW01'
+GW_BINARY_ALIGN = 64
+
+#side length of the square tiles of the transformed plane used by tile_GW_reference (in transformed units),
+#and number of GW snapshots read at a time while a reference is tiled
+GW_TILE_SIZE = 0.5
+GW_TILE_CHUNK_SIZE = 1000000
+
+#number of bootstrap replicates per task (and per random stream) of block_bootstrap_fC
+BOOTSTRAP_CHUNK_SIZE = 100
+
+#largest total size (bytes) of the entries of a ResultCache directory; the least recently used entries are
+#deleted beyond it
+RESULT_CACHE_SIZE = 2**30
+
+#part of every ResultCache key; to be increased whenever a cached computation changes its results
+RESULT_CACHE_VERSION = 1
+
+#number of protein/polymer snapshots searched against the GW tree at a time by GWWindowCoverage and
+#GW_neighborhoods, whatever the window step (the GW neighbors of a block are held as python lists until
+#they are converted, so this bounds memory)
+WINDOW_QUERY_BLOCK = 512
+
+#GWCoverageAccumulator searches a chunk against the GW tree (work proportional to the GW neighbors of the
+#chunk) unless the rest of the chunk is expected to have more than this many GW neighbors per uncovered GW
+#point; the uncovered GW points are then searched against a tree of the chunk instead
+COVERAGE_SEARCH_RATIO = 4
+
+def _plotting_modules():
+    #imports matplotlib (with pyplot) on first use; returns (matplotlib, pyplot)
+    import matplotlib
+    import matplotlib.pyplot as plt
+    import matplotlib.colors
+    import matplotlib.patches
+    import matplotlib.ticker
+    return matplotlib,plt
+
+
+def _timed_stage(stage):
+    #decorator recording a PyConforMap method as a stage (see PyConforMap.timed_stage)
+    def decorator(method):
+        @functools.wraps(method)
+        def timed_method(self,*args,**kwargs):
+            with self.timed_stage(stage):
+                return method(self,*args,**kwargs)
+        return timed_method
+    return decorator
+
 
 class PyConforMap():
     
@@ -38,11 +125,14 @@ class PyConforMap():
         relative radius of gyration, and instantaneous shape ratio. 
         Each row represents a conformation snapshot from the GW simulation.
         
-    poly_var : pandas dataframe of shape (n,2)
-        A dataframe of the protein/polymer simulation. 
+    protein_var : array of shape (n,2)
+        The protein/polymer simulation. 
         The first column is Rg/Rg_mean and the second column is instantaneous shape ratio. 
         Each row represents a conformation snapshot from the protein/polymer simulation.        
         
+    poly_var : pandas dataframe of shape (n,2)
+        protein_var as a dataframe, with columns 'Rg/Rg_mean' and 'ratio'.        
+        
     Methods
     -------
     plot_protein_against_GW 
@@ -50,32 +140,101 @@ class PyConforMap():
         
     check_boundary
         - computes % of protein/polymer points within the pre-assigned radius of GW points
+
+    coverage_mask
+        - flags which query points have at least one tree point within the pre-assigned radius
+          (KD-tree or grid backend)
+        
+    coverage_bitset
+        - which GW points are covered by the protein/polymer, packed into bits
+
+    fC_vs_radius
+        - computes fC for many radii from one nearest-neighbor search
+
+    bounded_fraction_vs_radius
+        - computes % of protein/polymer points close to GW points for many radii from one search
         
     change_xlim_ylim
         - update x-axis and y-axis limits of 2D scatter plot
         
     vary_protein
         - plot fC against protein/polymer snapshots
+
+    coverage_accumulator
+        - running fC for protein/polymer snapshots added chunk by chunk
+
+    approximate_fC
+        - fC with a confidence interval from a stratified sample of GW points, refined until precise enough
+
+    bootstrap_fC
+        - block-bootstrap confidence interval of fC over correlated snapshots
+
+    fC_sliding_window
+        - fC of every window of consecutive protein/polymer snapshots (time-resolved fC)
+
+    window_coverage
+        - running fC of the most recent protein/polymer snapshots, for snapshots added chunk by chunk
         
     vary_GW_ref
         - plot fC against GW snapshots        
+
+    fC_against_GW_snapshots
+        - computes fC for many GW snapshot counts in one pass
         
     regenerate_GW_chain
         - simulates new GW reference chain        
 
     save_GW_chain_to_csv
         - save current GW chain data to a csv file
+
+    save_GW_chain_to_binary
+        - save current GW chain data to a binary (memory-mappable) file
+
+    load_GW_chain
+        - use a saved GW chain (csv or binary) as reference
         
     retrieve_default_GW_chain
         - revert to default reference simulation        
+
+    timed_stage
+        - records wall time (and optionally peak memory) of a stage, when instrumentation is on
+
+    timing_summary
+        - summary of the recorded stages
+
+    (with cache, the results of fC_using_cdist, check_boundary, coverage_bitset, the fC curves, fC_sliding_window,
+    vary_protein and vary_GW_ref are kept in a ResultCache and reused for identical inputs)
         
     """
 
-    def __init__(self, csv_file,radius_= 0.1,max_x_val=3,max_y_val=30,min_x_val=0,min_y_val=0):
+    def __init__(self, csv_file,radius_= 0.1,max_x_val=3,max_y_val=30,min_x_val=0,min_y_val=0,
+                 GW_file=DEFAULT_GW_FILE,instrument=False,timing_callback=None,cache=None):
+        
+        #opt-in instrumentation: with instrument='time' (or True), the wall time of every stage is recorded in
+        #self.stage_timings and passed to timing_callback, if given (see timed_stage); with instrument='memory'
+        #the peak memory is traced as well, which slows the stages down (their wall times are inflated)
+        if instrument is True:
+            instrument = 'time'
+        if instrument not in (False,None,'time','memory'):
+            raise ValueError("instrument must be False, True, 'time' or 'memory'")
+        self.instrument = instrument or False
+        self._started_tracing = False
+        self.timing_callback = timing_callback
+        self.stage_timings = []
+        self._open_stages = []
+        
+        #optional on-disk cache of results (a ResultCache or a directory for one), shared by every instance
+        #and process using the same directory; results are only reused for identical inputs (see _cached)
+        if cache is not None and not isinstance(cache,ResultCache):
+            cache = ResultCache(cache)
+        self.cache = cache
+        self._protein_fingerprint = None
+        self._protein_fingerprint_key = None
         
         #load csv file, where first column is supposed to be Rg2 values and second column is Ree2 values
         #initialize the rg2 and ree2 variables
-        df_conf = pd.read_csv(csv_file)
+        with self.timed_stage('load_protein_data'):
+            df_conf = pd.read_csv(csv_file)
         self.protein_rg2 = df_conf.iloc[:,0].values
         self.protein_ree2 = df_conf.iloc[:,1].values
         
@@ -89,8 +248,12 @@ class PyConforMap():
         #the instantaneous shape ratio is calculated here
         #the file containing GW reference chain data should also have Rg/Rg_mean data
         #the self.GW_df MUST be single chain length
-        self.GW_df = pd.read_csv('GW_chainlen100.csv')
-        self.GW_df['ratio'] = self.GW_df['Rend2'].values/self.GW_df['Rg2'].values
+        #GW_file can also be a binary reference file written by save_GW_chain_to_binary
+        #the reference is shared with every other instance using the same file (see load_GW_reference),
+        #so self.GW_df should be replaced rather than modified in place
+        with self.timed_stage('load_GW_reference'):
+            self.GW_reference = load_GW_reference(GW_file)
+        self.GW_df = self.GW_reference.GW_df
         
         #the default radius is 0.1
         self.radius_ = radius_
@@ -108,13 +271,25 @@ class PyConforMap():
         #by default using all GW snapshots provided in the datafile
         self.GW_every_ith_snap = self.GW_df.shape[0]
         
-        #initialize the protein dataframe and both GW and protein coordinates
+        #initialize the protein data and both GW and protein coordinates
+        self._protein_data_key = None
         self.organize_data(self.protein_rg2,self.protein_ree2,self.upto_protein_snapshots,self.GW_every_ith_snap)
         
         #for the loaded data, print out what % is close to GW points
         self.check_boundary()
         
-    def plot_protein_against_GW(self,protein_label,provided_color='magenta'):
+    @_timed_stage('plot_protein_against_GW')
+    def plot_protein_against_GW(self,protein_label,provided_color='magenta',mode='scatter',save_to=None,
+                                density_bins=400):
+        #mode='scatter' draws every point as a marker (vector output)
+        #mode='rasterized' draws the same markers, stored as an image in vector output files (much smaller files)
+        #mode='density' draws the GW points as a 2D histogram image (density_bins x density_bins cells), which
+        #is computed once per GW reference and axis limits, and the protein points as an image of occupied cells
+        #with save_to, the figure is saved to that file and closed (for rendering many proteins headlessly)
+        if mode not in ('scatter','rasterized','density'):
+            raise ValueError("mode must be 'scatter', 'rasterized' or 'density'")
+
+        matplotlib,plt = _plotting_modules()
 
         #x-axis label and y-axis label
         x_variable=r'$R_g\left/R_g^{mean}\right.$' 
@@ -127,11 +302,11 @@ class PyConforMap():
         #several scatter plot markers are set here
         scatter_markers=['d','x',4,'o','v','^','1','8','s','p','P','*','X','D',9]
 
-        #save x_total and y_total and x_polmodel_GW and y_polmodel_GW as simple lists
-        x_total = self.poly_var['Rg/Rg_mean'].values.tolist()
-        y_total = self.poly_var['ratio'].values.tolist()
-        x_polmodel_GW = self.GW_df['Rg/Rg_mean'].values.tolist()
-        y_polmodel_GW = self.GW_df['ratio'].values.tolist()
+        #x_total and y_total and x_polmodel_GW and y_polmodel_GW are numpy arrays (no copies)
+        x_total = self.protein_var[:,0]
+        y_total = self.protein_var[:,1]
+        x_polmodel_GW = self.GW_df['Rg/Rg_mean'].values
+        y_polmodel_GW = self.GW_df['ratio'].values
 
         #calculate fC value using fC method provided in class
         self.fC_value = self.fC_using_cdist(self.upto_protein_snapshots,
@@ -143,29 +318,29 @@ class PyConforMap():
         #There is a separate method in the class if these default xlim and ylim values need to be changed
         #below it checks whether datapoints exceed the axis limits, and resets limits if they do
         #the default minimum axis limits for both x- and y-axis are 0
-        if self.GW_df['Rg/Rg_mean'].max()>self.max_x_val:
-            self.max_x_val = self.GW_df['Rg/Rg_mean'].max()
+        if np.max(x_polmodel_GW)>self.max_x_val:
+            self.max_x_val = np.max(x_polmodel_GW)
             print('x-axis maximum limit updated from default value')
-        if self.GW_df['Rg/Rg_mean'].min()<self.min_x_val:
-            self.min_x_val = self.GW_df['Rg/Rg_mean'].min()
+        if np.min(x_polmodel_GW)<self.min_x_val:
+            self.min_x_val = np.min(x_polmodel_GW)
             print('x-axis minimum limit updated from default value')            
-        if max(x_total)>self.max_x_val:
-            self.max_x_val = max(x_total)
+        if np.max(x_total)>self.max_x_val:
+            self.max_x_val = np.max(x_total)
             print('x-axis maximum limit updated from default value')            
-        if min(x_total)<self.min_x_val:
-            self.min_x_val = min(x_total)
+        if np.min(x_total)<self.min_x_val:
+            self.min_x_val = np.min(x_total)
             print('x-axis minimum limit updated from default value')            
-        if self.GW_df['ratio'].max()>self.max_y_val:
-            self.max_y_val = self.GW_df['ratio'].max()
+        if np.max(y_polmodel_GW)>self.max_y_val:
+            self.max_y_val = np.max(y_polmodel_GW)
             print('y-axis maximum limit updated from default value')                        
-        if self.GW_df['ratio'].min()<self.min_y_val:   
-            self.min_y_val = self.GW_df['ratio'].min()            
+        if np.min(y_polmodel_GW)<self.min_y_val:   
+            self.min_y_val = np.min(y_polmodel_GW)            
             print('y-axis minimum limit updated from default value')                        
-        if max(y_total)>self.max_y_val:
-            self.max_y_val = max(y_total)
+        if np.max(y_total)>self.max_y_val:
+            self.max_y_val = np.max(y_total)
             print('y-axis maximum limit updated from default value')                        
-        if min(y_total)<self.min_y_val:
-            self.min_y_val = min(y_total)
+        if np.min(y_total)<self.min_y_val:
+            self.min_y_val = np.min(y_total)
             print('y-axis minimum limit updated from default value')                        
 
         xlims = [self.min_x_val,self.max_x_val]
@@ -205,16 +380,35 @@ class PyConforMap():
         nybins = 50
         nbins = nxbins+nybins
         
-        #plot the reference GW scatter plot (Rg/Rg_mean against instantaneous shape ratio)
-        axTemperature.scatter(x_polmodel_GW,y_polmodel_GW,
-                          marker=scatter_markers[3],s=40,alpha=0.6,color='black',
-                           label='GW')
+        if mode=='density':
+            #plot the reference GW points as a 2D histogram image (log scale, empty cells left blank)
+            #and the protein points as an image of the cells holding at least one protein point
+            GW_counts,xedges,yedges = self.GW_reference.density_raster(xmin,xmax,ymin,ymax,density_bins)
+            axTemperature.imshow(np.ma.masked_equal(np.log1p(GW_counts.T),0),origin='lower',
+                                 extent=[xmin,xmax,ymin,ymax],aspect='auto',cmap='Greys',
+                                 vmin=-0.5*np.log1p(GW_counts.max()),interpolation='nearest')
+            protein_counts,_,_ = np.histogram2d(x_total,y_total,bins=[xedges,yedges])
+            protein_image = np.zeros(protein_counts.T.shape+(4,))
+            protein_image[...,:3] = matplotlib.colors.to_rgb(provided_color)
+            protein_image[...,3] = 0.6*(protein_counts.T>0)
+            axTemperature.imshow(protein_image,origin='lower',extent=[xmin,xmax,ymin,ymax],aspect='auto',
+                                 interpolation='nearest')
+            #images have no legend entries, so the legend uses patches of the same colors
+            legend_handles=[matplotlib.patches.Patch(color='black',alpha=0.6,label='GW'),
+                            matplotlib.patches.Patch(color=provided_color,alpha=0.6,label=protein_label)]
+        else:
+            legend_handles=None
 
-        #plot the protein scatter plot (Rg/Rg_mean against instantaneous shape ratio)
-        axTemperature.scatter(x_total,
-                   y_total,
-                   marker=scatter_markers[0],s=40,alpha=0.6,color=provided_color,
-                                          label=protein_label)                
+            #plot the reference GW scatter plot (Rg/Rg_mean against instantaneous shape ratio)
+            axTemperature.scatter(x_polmodel_GW,y_polmodel_GW,
+                              marker=scatter_markers[3],s=40,alpha=0.6,color='black',
+                               label='GW',rasterized=(mode=='rasterized'))
+
+            #plot the protein scatter plot (Rg/Rg_mean against instantaneous shape ratio)
+            axTemperature.scatter(x_total,
+                       y_total,
+                       marker=scatter_markers[0],s=40,alpha=0.6,color=provided_color,
+                                              label=protein_label,rasterized=(mode=='rasterized'))                
         
         self.plot_style(axTemperature,xlabel,
                         ylabel,fontsize = 19, labelsize = 22, rotation = 0)
@@ -228,16 +422,18 @@ class PyConforMap():
         ybins = np.arange(ymin, ymax, (ymax-ymin)/nbins)
 
         #plot the histograms on the top and side
-        axHistx.hist(x_polmodel_GW, bins=xbins, color = 'black',
-                    alpha=0.5,density=True)
-        axHistx.hist(x_total, bins=xbins, color = provided_color,
-                    alpha=0.5,density=True)
+        #the histograms are computed with numpy (the GW ones once per GW reference and bins) and drawn as steps
+        GW_xhist,GW_yhist = self.GW_reference.histograms(xbins,ybins)
+        axHistx.stairs(GW_xhist, xbins, color = 'black',
+                    alpha=0.5,fill=True)
+        axHistx.stairs(np.histogram(x_total, bins=xbins, density=True)[0], xbins, color = provided_color,
+                    alpha=0.5,fill=True)
 
-        axHisty.hist(y_polmodel_GW, bins=ybins, color = 'black',orientation='horizontal',
-                    alpha=0.5,density=True)
+        axHisty.stairs(GW_yhist, ybins, color = 'black',orientation='horizontal',
+                    alpha=0.5,fill=True)
 
-        axHisty.hist(y_total, bins=ybins, color = provided_color,orientation='horizontal',
-                    alpha=0.5,density=True)
+        axHisty.stairs(np.histogram(y_total, bins=ybins, density=True)[0], ybins, color = provided_color,
+                    orientation='horizontal',alpha=0.5,fill=True)
 
         #it does not matter what i set as xlabel for axHistx and ylabel for axHisty b/c i will remove these labels
         self.plot_style(axHistx,xlabel,
@@ -251,7 +447,7 @@ class PyConforMap():
                           transform=axTemperature.transAxes,fontsize=18)
         
         #add legend for scatter plot
-        axTemp_legend=axTemperature.legend(fontsize=15,loc='upper right')
+        axTemp_legend=axTemperature.legend(handles=legend_handles,fontsize=15,loc='upper right')
         
         #cosmetic modifications
         frame = axTemp_legend.get_frame()
@@ -263,8 +459,8 @@ class PyConforMap():
         axHisty.set_ylim( ymin, ymax )
 
         #cosmetic modifications
-        axHisty.xaxis.set_major_locator(MaxNLocator(4))
-        axHistx.yaxis.set_major_locator(MaxNLocator(3))
+        axHisty.xaxis.set_major_locator(matplotlib.ticker.MaxNLocator(4))
+        axHistx.yaxis.set_major_locator(matplotlib.ticker.MaxNLocator(3))
                     
         #for the x-axis and y-axis histograms, remove any marks or ticks on the x and y axis respectively
         axHistx.axes.get_xaxis().set_visible(False)
@@ -272,42 +468,82 @@ class PyConforMap():
 
         plt.setp(axTemperature.get_yticklabels()[-1], visible=False)
         plt.setp(axTemperature.get_xticklabels()[-1], visible=False)
+
+        if save_to is not None:
+            fig.savefig(save_to)
+            plt.close(fig)
+        return fig
         
     #this function calculates fC score
-    def fC_using_cdist(self,upto_protein_snapshots,GW_every_ith_snap,protein_name = 'protein'):
+    #method is 'kdtree' (default) or 'grid', see points_within_radius_grid; both give the same fC
+    @_timed_stage('fC_using_cdist')
+    def fC_using_cdist(self,upto_protein_snapshots,GW_every_ith_snap,protein_name = 'protein',method='kdtree'):
         
-        self.organize_data(self.protein_rg2,self.protein_ree2,upto_protein_snapshots,GW_every_ith_snap)
-        #iterate through each GW point and identify the GW points that do NOT have protein points in range
-        protein_not_in_range=[]
-        j=0
-        for point in self.GW_points:
-
-            if not self.tree_protein.query_ball_point(point,self.radius_):
-                protein_not_in_range.append(point)
-            j+=1
+        def compute():
+            self.organize_data(self.protein_rg2,self.protein_ree2,upto_protein_snapshots,GW_every_ith_snap)
+            #flag, in one batched query, every GW point that has at least one protein point in range
+            GW_in_range = self.coverage_mask(self.tree_protein,self.GW_points,method=method)
             
-        #find the number of GW points that have protein points in their range
-        #that number is found by subtracting # of GW points without proteins in range from total # of GW points
-        #calculate fC by dividing # of GW points with protein points in range by total # of GW points
-        fC_by_distance=(self.GW_points.shape[0]-len(protein_not_in_range))/(self.GW_points.shape[0])
+            #calculate fC by dividing # of GW points with protein points in range by total # of GW points
+            fC_by_distance=np.count_nonzero(GW_in_range)/(self.GW_points.shape[0])
 
-        #re-initialize the self.GW_points and self.protein_points AND other data
+            #re-initialize the self.GW_points and self.protein_points AND other data
+            self.organize_data(self.protein_rg2,self.protein_ree2,self.upto_protein_snapshots,self.GW_every_ith_snap)
+            return {'fC':fC_by_distance}
+        #compute organizes the data with the current GW reference (e.g. after regenerate_GW_chain); doing so first
+        #keys the result on that reference and leaves the same data organized when the result is cached
         self.organize_data(self.protein_rg2,self.protein_ree2,self.upto_protein_snapshots,self.GW_every_ith_snap)
-        return fC_by_distance    
+        return float(self._cached('fC_using_cdist',(upto_protein_snapshots,GW_every_ith_snap,method),compute)['fC'])
 
-    def check_boundary(self,protein_name = 'protein'):
+    @_timed_stage('check_boundary')
+    def check_boundary(self,protein_name = 'protein',method='kdtree'):
         
-        protein_not_in_range=[]
-        j=0
-        for point in self.protein_points:
-            if not self.tree_GW.query_ball_point(point,self.radius_):
-                protein_not_in_range.append(point)
-            j+=1
+        def compute():
+            #flag, in one batched query, every protein point that has at least one GW point in range
+            protein_in_range = self.coverage_mask(self.tree_GW,self.protein_points,method=method)
+            return {'bounded_fraction':np.count_nonzero(protein_in_range)/(self.protein_points.shape[0])}
             
-        bounded_fraction=(self.protein_points.shape[0]-len(protein_not_in_range))/(self.protein_points.shape[0])
+        bounded_fraction=float(self._cached('check_boundary',self._snapshot_limits()+(method,),
+                                            compute)['bounded_fraction'])
         self.bounded_fraction = bounded_fraction
         return print(f'{format(bounded_fraction*100,"0.2f")}% of protein/polymer snapshots are close to at least 1 GW snapshot')
     
+    def coverage_mask(self,tree,query_points,workers=-1,method='kdtree'):
+        #returns a boolean array with one entry per query point, True if the tree holds at least one point
+        #within self.radius_ of it (see points_within_radius and points_within_radius_grid)
+        if method=='kdtree':
+            return points_within_radius(tree,query_points,self.radius_,workers=workers)
+        elif method=='grid':
+            return points_within_radius_grid(tree,query_points,self.radius_,workers=workers)
+        raise ValueError("method must be 'kdtree' or 'grid'")
+
+    def coverage_bitset(self,packed=True):
+        #the GW points covered by the current protein/polymer points (the GW points counted by fC), packed into
+        #bits with np.packbits (8 GW points per byte, see landscape_overlap), or as a boolean array if not packed
+        coverage = self._cached('coverage_bitset',self._snapshot_limits(),
+                                lambda: {'coverage':np.packbits(self.coverage_mask(self.tree_protein,self.GW_points))})
+        if packed:
+            return coverage['coverage']
+        return unpack_coverage(coverage['coverage'],self.GW_points.shape[0])
+
+    @_timed_stage('fC_vs_radius')
+    def fC_vs_radius(self,radii=None):
+        #fC for many radii at once, using the current protein/polymer and GW snapshots
+        #the smallest radius at which a GW point counts is its distance to the nearest protein point, so one
+        #nearest-neighbor search gives fC for every radius (see fraction_within_radii)
+        #returns (radii, fC values); with radii=None, the exact curve (every distinct nearest distance) is returned
+        curve = self._cached('fC_vs_radius',self._snapshot_limits()+(radii,),
+                             lambda: dict(zip(('radii','fC'),fraction_within_radii(self.tree_protein,self.GW_points,radii))))
+        return curve['radii'],curve['fC']
+
+    @_timed_stage('bounded_fraction_vs_radius')
+    def bounded_fraction_vs_radius(self,radii=None):
+        #same as fC_vs_radius for the fraction of protein/polymer points close to at least one GW point
+        curve = self._cached('bounded_fraction_vs_radius',self._snapshot_limits()+(radii,),
+                             lambda: dict(zip(('radii','bounded_fraction'),
+                                              fraction_within_radii(self.tree_GW,self.protein_points,radii))))
+        return curve['radii'],curve['bounded_fraction']
+
     def change_xlim_ylim(self,min_x_val,min_y_val,max_x_val,max_y_val):
         #the default xlim max is 3 and default xlim min is 0
         #the default ylim max is 30 and default ylim min is 0
@@ -317,22 +553,17 @@ class PyConforMap():
         self.max_y_val = max_y_val
         print('New axis limits generated')
         
+    @_timed_stage('vary_GW_ref')
     def vary_GW_ref(self, protein_lab, no_dots = 40):
-        print('this might take a couple of minutes')        
-        print('if it takes too long to run, please consider a smaller no_dots value (default set at 40)')
-        #as of now the interval of snapshots (stride) is set so that the number of data points on the plot is 40
-        #too many snapshots take longer to process
+        #the whole curve comes from a single coverage pass, so no_dots can be raised freely
+        matplotlib,plt = _plotting_modules()
         fig,ax = plt.subplots(figsize=(10,8))
 
         every_yth_snap = round(len(self.protein_rg2)/no_dots)
         
-        ref_snaps=[]
-        fC_vary_ref=[]
-        for GW_ref_snapshots in range(every_yth_snap,self.GW_df.shape[0]+every_yth_snap,
-                                    every_yth_snap):
-            ref_snaps.append(GW_ref_snapshots)
-            fC_vary_ref.append(self.fC_using_cdist(self.upto_protein_snapshots,
-                                               GW_ref_snapshots,protein_name = 'protein'))
+        ref_snaps=list(range(every_yth_snap,self.GW_df.shape[0]+every_yth_snap,
+                                    every_yth_snap))
+        fC_vary_ref=self.fC_against_GW_snapshots(ref_snaps)
 
         ax.scatter(ref_snaps,
                    fC_vary_ref,
@@ -348,36 +579,36 @@ class PyConforMap():
         ax.legend(fontsize=16)
         ax.get_xaxis().set_major_formatter(
         matplotlib.ticker.FuncFormatter(lambda x, p: format(x/10**6, '0.2f')))        
-    def regenerate_GW_chain(self,chain_length,nosnaps,interval=1,mu=0,sigma=1):
-        chain_length=chain_length
-        x = np.zeros(chain_length)
-        y = np.zeros(chain_length)
-        z = np.zeros(chain_length)
-        nosnaps = nosnaps
-        interval=interval
-        snapshot=0
-        mu = mu
-        sigma = sigma #kuhn length
-        Rend2 = []
-        Rg2 = []
-        while snapshot<(nosnaps*interval):
-            for i in range(1,chain_length,1):
-                x[i] = x[i-1] + rd.gauss(mu,sigma)
-                y[i] = y[i-1] + rd.gauss(mu,sigma)
-                z[i] = z[i-1] + rd.gauss(mu,sigma)        
-            if snapshot in np.arange(0,(nosnaps*interval),interval):
-                Rend2.append(self.Ree2(x,y,z))
-                Rg2.append(self.Rgx2(x,chain_length)+self.Rgy2(y,chain_length)+self.Rgz2(z,chain_length))
-            snapshot = snapshot + 1   
-        master_out=pd.DataFrame(np.array([Rg2,
-                           Rend2]).T,columns=['Rg2','Rend2'])
-        master_out.insert(0,'chain_length',np.repeat(chain_length,nosnaps))
-        rg_val = np.array(master_out.Rg2)**0.5
-        rg_mean = np.mean(rg_val)
-        master_out['Rg/Rg_mean'] = rg_val/rg_mean
-        del rg_val, rg_mean
-        self.GW_df = master_out.copy()
-        self.GW_df['ratio'] = self.GW_df['Rend2'].values/self.GW_df['Rg2'].values
+    @_timed_stage('fC_against_GW_snapshots')
+    def fC_against_GW_snapshots(self,GW_ref_snapshots):
+        #fC for several GW prefix lengths, e.g. [18000, 36000, ...]
+        #whether a GW point is covered does not depend on how many GW points come before it,
+        #so every prefix is answered from one coverage mask over all GW points and a cumulative sum
+        GW_ref_snapshots = np.asarray(GW_ref_snapshots,dtype=int)
+        def compute():
+            self.organize_data(self.protein_rg2,self.protein_ree2,self.upto_protein_snapshots,self.GW_df.shape[0])
+            GW_in_range = self.coverage_mask(self.tree_protein,self.GW_points)
+            no_covered = np.concatenate([[0],np.cumsum(GW_in_range)])
+
+            #prefixes longer than the GW data are clipped to the full GW data, as slicing did before
+            GW_snapshots = np.minimum(GW_ref_snapshots,self.GW_points.shape[0])
+            fC_vary_ref = no_covered[GW_snapshots]/GW_snapshots
+
+            #re-initialize the self.GW_points and self.protein_points AND other data
+            self.organize_data(self.protein_rg2,self.protein_ree2,self.upto_protein_snapshots,self.GW_every_ith_snap)
+            return {'fC':fC_vary_ref}
+        #organized with the current GW reference first, as in fC_using_cdist
+        self.organize_data(self.protein_rg2,self.protein_ree2,self.upto_protein_snapshots,self.GW_every_ith_snap)
+        return self._cached('fC_against_GW_snapshots',(self.upto_protein_snapshots,GW_ref_snapshots),compute)['fC']
+    @_timed_stage('regenerate_GW_chain')
+    def regenerate_GW_chain(self,chain_length,nosnaps,interval=1,mu=0,sigma=1,seed=None,workers=1):
+        #sigma is the kuhn length
+        #each snapshot is an independent walk started from the origin, so interval (the number of
+        #conformations generated per kept snapshot) does not change the simulation and no longer costs anything
+        #the snapshots are generated in batches with numpy (see generate_GW_snapshots); a seed makes it reproducible
+        #and the batches can be spread over several processes (workers) without changing the result
+        Rg2,Rend2 = generate_GW_snapshots(chain_length,nosnaps,mu=mu,sigma=sigma,seed=seed,workers=workers)
+        self.GW_df = GW_dataframe(chain_length,Rg2,Rend2)
         print(f'New GW reference chain of length {chain_length} has been initialized for this instance')
         return self.GW_df
     def Ree2(self,x,y,z):
@@ -396,10 +627,23 @@ class PyConforMap():
         #will be saved to current directory by default
         self.GW_df.to_csv(direc_and_filename,
                           index=False)
+    def save_GW_chain_to_binary(self, direc_and_filename = './GW_chain_simulation.gwref'):
+        #binary counterpart of save_GW_chain_to_csv, also storing the transformed GW coordinates and the
+        #mean and stdev values, so the file can be memory-mapped and used without any parsing
+        if self.GW_reference.GW_df is not self.GW_df:
+            self.GW_reference = GWReference(self.GW_df)
+        save_GW_reference_binary(self.GW_reference,direc_and_filename)
+    def load_GW_chain(self, direc_and_filename):
+        #use a GW chain saved with save_GW_chain_to_csv or save_GW_chain_to_binary as the reference
+        #(takes effect at the next fC computation, like regenerate_GW_chain)
+        self.GW_reference = load_GW_reference(direc_and_filename)
+        self.GW_df = self.GW_reference.GW_df
     def retrieve_default_GW_chain(self):
-        self.GW_df = pd.read_csv('GW_chainlen100.csv')
-        self.GW_df['ratio'] = self.GW_df['Rend2'].values/self.GW_df['Rg2'].values
+        #served from the shared reference cache if the file has not changed since it was last read
+        self.GW_reference = load_GW_reference(DEFAULT_GW_FILE)
+        self.GW_df = self.GW_reference.GW_df
     def plot_style(self,ax,xlabel,ylabel,fontsize = 19, labelsize = 22, rotation = 0):
+        matplotlib,plt = _plotting_modules()
         plt.setp(ax.get_xticklabels(),fontsize=fontsize,rotation=rotation)
         plt.setp(ax.get_yticklabels(),fontsize=fontsize)
         ax.set_xlabel(xlabel,fontsize=labelsize)
@@ -409,109 +653,178 @@ class PyConforMap():
         ax.minorticks_on()
         ax.tick_params(axis='both', which='major', labelsize=fontsize, width = 1.7, size = 8,pad=10)
         ax.tick_params(axis='both', which='minor', width = 1.2, size = 5) 
+    @_timed_stage('organize_data')
     def organize_data(self, provided_rg2, provided_ree2,upto_protein_snapshots,GW_every_ith_snap,
                           protein_name = 'protein'):
 
-        #calculate Rg values from Rg2 values for protein
-        #calculate protein shape ratio value as well
+        #the transformed GW coordinates, their mean and stdev values and the GW tree are taken from the
+        #GW reference, which computes them once and shares them between calls and instances
+        #if self.GW_df was replaced (e.g. by regenerate_GW_chain) a new reference is made from it
+        if self.GW_reference.GW_df is not self.GW_df:
+            self.GW_reference = GWReference(self.GW_df)
+        self.GW_mean=self.GW_reference.GW_mean
+        self.GW_std=self.GW_reference.GW_std
+        #the reference the organized data comes from; self.GW_reference may be replaced before the next call
+        #(e.g. by load_GW_chain), while the GW points and tree below stay those of this one
+        self._organized_GW_reference = self.GW_reference
 
+        #calculate protein Rg/Rg_mean and shape ratio values, and transform them with the GW mean and stdev values
         #however use the same rg_mean value initialized originally so we keep consistent rg_mean value
-        protein_rg = np.array(provided_rg2)**0.5
-        protein_ratio = np.array(provided_ree2)/np.array(provided_rg2)
-        protein_relative_rg = protein_rg/self.protein_rg_mean
+        #this is only done when the provided data, rg_mean or GW reference changed since the last call;
+        #otherwise the arrays (and the protein trees of the most recently used prefixes) are reused
+        protein_data_key = (provided_rg2,provided_ree2,self.protein_rg_mean,self.GW_reference)
+        if (self._protein_data_key is None or
+                any(new is not old for new,old in zip(protein_data_key,self._protein_data_key))):
+            provided_rg2 = np.asarray(provided_rg2,dtype=float)
+            provided_ree2 = np.asarray(provided_ree2,dtype=float)
+            self.protein_var = np.c_[provided_rg2**0.5/self.protein_rg_mean, provided_ree2/provided_rg2]
+            #stdd just means transformed or standardized
+            self._stdd_protein_var = (self.protein_var-self.GW_mean)/self.GW_std
+            self._protein_trees = OrderedDict()
+            self._protein_data_key = protein_data_key
 
-        #arbitrary name just for this method 
-        protein_label='protein_'+protein_name    
+        #use protein and transformed GW Rg/Rg_mean and ins. shape ratio values as coordinates
+        #GW_points represents coordinates for GW in the format (Rg/Rg_mean, ins. shape ratio)
+        #protein_points represents coordinates for protein in that same format
+        #these (Rg/Rg_mean, ins. shape ratio) values are transformed values
+        #both are views of the stored arrays, no data is copied
+        self.GW_points=self.GW_reference.points(GW_every_ith_snap)
+        self.protein_points=self._stdd_protein_var[:upto_protein_snapshots]
 
-        #create a pandas dataframe of Rg/Rg_mean and instantaneous shape ratio for protein
-        self.poly_var = pd.DataFrame(data = zip(protein_relative_rg,
-                                         protein_ratio),columns=['Rg/Rg_mean','ratio']).copy()
+        with self.timed_stage('GW_tree'):
+            self.tree_GW=self.GW_reference.tree(GW_every_ith_snap)
+        with self.timed_stage('protein_tree'):
+            self.tree_protein=self._protein_tree(self.protein_points.shape[0])
 
-        protein_pro = self.poly_var[['Rg/Rg_mean','ratio']].iloc[:upto_protein_snapshots,:].copy()
-        protein_pro['polymer_id']=np.repeat(protein_label,protein_pro.shape[0])
+    def _protein_tree(self,upto_protein_snapshots):
+        #KD-tree of the first protein points, the PROTEIN_TREE_CACHE_SIZE most recently used ones are kept
+        if upto_protein_snapshots in self._protein_trees:
+            self._protein_trees.move_to_end(upto_protein_snapshots)
+        else:
+            self._protein_trees[upto_protein_snapshots] = spatial.cKDTree(
+                self._stdd_protein_var[:upto_protein_snapshots])
+            if len(self._protein_trees)>PROTEIN_TREE_CACHE_SIZE:
+                self._protein_trees.popitem(last=False)
+        return self._protein_trees[upto_protein_snapshots]
 
-        #the GW_po variable is for GW
-        GW_po=self.GW_df[['Rg/Rg_mean','ratio']].iloc[:GW_every_ith_snap,:].copy()
-        GW_po['polymer_id']=np.repeat('GW',GW_po.shape[0])
+    def _snapshot_limits(self):
+        #numbers of protein/polymer and GW snapshots currently organized (part of the cache keys of the
+        #methods that use the current points)
+        return (self.protein_points.shape[0],self.GW_points.shape[0])
 
-        #calculate mean and stdev values (must keep same mean and stdev values)
-        #calculating mean and stdev values of Rg/Rg_mean and shape ratio for GW
-        upto_snapshots=720000
-        GW_mean_Rg_Rg_mean=np.mean(self.GW_df['Rg/Rg_mean'].values[0:(upto_snapshots+1)])
-        GW_std_Rg_Rg_mean=np.std(self.GW_df['Rg/Rg_mean'].values[0:(upto_snapshots+1)])
-        GW_mean_ratio=np.mean(self.GW_df['ratio'].values[0:(upto_snapshots+1)])
-        GW_std_ratio=np.std(self.GW_df['ratio'].values[0:(upto_snapshots+1)])
+    def _cached(self,name,params,compute):
+        #returns compute(), a dictionary of arrays/numbers, through self.cache when there is one
+        #the key is made of name, params, the protein/polymer Rg2 and Ree2 values, protein_rg_mean, the GW
+        #reference points and radius_, so any change to the inputs gives a new key (and a new computation)
+        #compute uses the data of the last organize_data call, so the key is made from that data as well (the
+        #GW reference and protein/polymer values it used), not from a reference set or generated since then;
+        #methods that organize the data themselves do so with the current reference before calling _cached
+        if self.cache is None:
+            return compute()
+        provided_rg2,provided_ree2,protein_rg_mean,_ = self._protein_data_key
+        #the protein/polymer data is only hashed again when the arrays were replaced
+        protein_fingerprint_key = (provided_rg2,provided_ree2)
+        if (self._protein_fingerprint_key is None or
+                any(new is not old for new,old in zip(protein_fingerprint_key,self._protein_fingerprint_key))):
+            self._protein_fingerprint = result_cache_key(np.asarray(provided_rg2,dtype=float),
+                                                         np.asarray(provided_ree2,dtype=float))
+            self._protein_fingerprint_key = protein_fingerprint_key
+        key = result_cache_key(name,params,self._protein_fingerprint,protein_rg_mean,
+                               self._organized_GW_reference.fingerprint(),self.radius_)
+        return self.cache.get_or_compute(key,compute)
 
-        #create a pandas dataframe with combined GW and protein Rg/Rg_mean and instantaneous shape ratio 
-        combined_pro_po=pd.concat([GW_po,protein_pro],axis=0,ignore_index=True)
+    @contextmanager
+    def timed_stage(self,stage):
+        #records the wall time of the code inside the with block as one stage, if instrumentation is on, and
+        #with instrument='memory' its peak memory (numpy and python allocations, traced with tracemalloc);
+        #stages can be nested, in which case the time and memory of the inner stages are included in the outer one
+        if not self.instrument:
+            yield
+            return
+        if self.instrument=='time':
+            self._open_stages.append([stage,None,None])
+            start_time = time.perf_counter()
+            try:
+                yield
+            finally:
+                wall_time = time.perf_counter()-start_time
+                self._open_stages.pop()
+                self._record_stage(stage,wall_time,None)
+            return
+        #tracing is only stopped at the end by the stage that started it, so a tracemalloc session of the
+        #caller is left running (its peak is reset by every stage, though)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        current_memory,peak_memory = tracemalloc.get_traced_memory()
+        if self._open_stages:
+            #keep the peak reached so far by the enclosing stage before resetting the peak for this stage
+            self._open_stages[-1][2] = max(self._open_stages[-1][2],peak_memory)
+        tracemalloc.reset_peak()
+        self._open_stages.append([stage,current_memory,current_memory])
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter()-start_time
+            _,start_memory,peak_memory = self._open_stages.pop()
+            peak_memory = max(peak_memory,tracemalloc.get_traced_memory()[1])
+            if self._open_stages:
+                self._open_stages[-1][2] = max(self._open_stages[-1][2],peak_memory)
+            elif self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+            self._record_stage(stage,wall_time,peak_memory-start_memory)
 
-        #transform all the Rg/Rg_mean and ins. shape ratio values (belonging to both protein and GW)
-        #stdd just means transformed or standardized
-        combined_pro_po['stdd_Rg/Rg_mean']=(combined_pro_po['Rg/Rg_mean'].values-GW_mean_Rg_Rg_mean)/(GW_std_Rg_Rg_mean)
-        combined_pro_po['stdd_ratio']=(combined_pro_po['ratio'].values-GW_mean_ratio)/(GW_std_ratio)
+    def _record_stage(self,stage,wall_time,peak_memory):
+        #peak_memory is None when memory is not traced (instrument='time')
+        record = {'stage':stage,'wall_time_s':wall_time,'peak_memory_bytes':peak_memory,
+                  'depth':len(self._open_stages)}
+        self.stage_timings.append(record)
+        if self.timing_callback is not None:
+            self.timing_callback(record)
 
-        #isolate the transformed Rg/Rg_mean and instantaneous shape ratio values into separate variables
-        #separate Rg/Rg_mean and instantaneous shape ratio variable for protein & GW
-        po_x=combined_pro_po[combined_pro_po.polymer_id=='GW']['stdd_Rg/Rg_mean'].values
-        po_y=combined_pro_po[combined_pro_po.polymer_id=='GW']['stdd_ratio'].values
-        pro_x=combined_pro_po[combined_pro_po.polymer_id==protein_label]['stdd_Rg/Rg_mean'].values
-        pro_y=combined_pro_po[combined_pro_po.polymer_id==protein_label]['stdd_ratio'].values
+    def timing_summary(self):
+        #dataframe of the recorded stages: number of calls, total and maximum wall time, maximum peak memory
+        stage_timings = pd.DataFrame(self.stage_timings,columns=['stage','wall_time_s','peak_memory_bytes','depth'])
+        return stage_timings.groupby('stage',sort=False).agg(calls=('wall_time_s','size'),
+                                                            total_wall_time_s=('wall_time_s','sum'),
+                                                            max_wall_time_s=('wall_time_s','max'),
+                                                            max_peak_memory_bytes=('peak_memory_bytes','max'))
 
-        #use protein and transformed GW Rg/Rg_mean and ins. shape ratio values as coordinates
-        #GW_points represents coordinates for GW in the format (Rg/Rg_mean, ins. shape ratio)
-        #protein_points represents coordinates for protein in that same format
-        #these (Rg/Rg_mean, ins. shape ratio) values are transformed values
-        self.GW_points=np.c_[po_x, po_y]
-        self.protein_points=np.c_[pro_x, pro_y]            
+    @property
+    def poly_var(self):
+        #dataframe of the protein Rg/Rg_mean and instantaneous shape ratio values, made on request
+        #(a view of the protein_var array)
+        return pd.DataFrame(self.protein_var,columns=['Rg/Rg_mean','ratio'],copy=False)
 
-        self.tree_GW=spatial.cKDTree(self.GW_points)
-        self.tree_protein=spatial.cKDTree(self.protein_points)         
+    @_timed_stage('vary_protein')
     def vary_protein(self, protein_lab, no_dots = 20):
-        print('this might take a couple of minutes')
-        print('if it takes too long to run, please consider a lower no_dots value (default set at 20)')        
         
         interv = round(len(self.protein_rg2)/no_dots)
         
-        temp_df = pd.DataFrame(data = zip(self.protein_rg2,self.protein_ree2),columns=['Rg2','Ree2']).copy()
         protein_snaps = []
         fC_vary_protein = []
 
+        from more_itertools import sliced
+        matplotlib,plt = _plotting_modules()
         fig,ax = plt.subplots(figsize=(10,8))
-        #here i am applying the sliced function from more_itertools to divide my dataframe into chunks
+        #here i am applying the sliced function from more_itertools to divide the snapshots into chunks
         #if the last chunk has fewer rows (i.e. less than the defined interval) than previous chunks than that is fine
-        temp_df_index_slices = sliced(range(len(temp_df)), interv)
-        allGW_indx = np.array(range(0,self.GW_points.shape[0]))        
-
-        j=0
-        for index_slice in temp_df_index_slices:
-
-            #each chunk has different start point and end point
-            chunk = temp_df.iloc[index_slice] 
+        #each chunk is added to one coverage accumulator, so the GW tree is built once and every
+        #protein snapshot is only looked at once
+        def compute():
+            accumulator = self.coverage_accumulator()
+            for index_slice in sliced(range(len(self.protein_rg2)), interv):
 
-            #protein_snaps is appending 0 to current end point from the 'chunk' df
-            protein_snaps.append(temp_df[0:(chunk.iloc[-1].name)+1].shape[0])
+                accumulator.add_snapshots(self.protein_rg2[index_slice],self.protein_ree2[index_slice])
 
-            temp_rg2 = list(chunk.Rg2.values)
-            temp_ree2 = list(chunk.Ree2.values)    
-
-            self.organize_data(temp_rg2,temp_ree2,len(temp_ree2),self.GW_every_ith_snap)
-
-            temp_protein_not_in_range = []
-            for point,ind in zip(self.GW_points,allGW_indx):
-                if not self.tree_protein.query_ball_point(point,self.radius_):
-                    temp_protein_not_in_range.append(ind)
-            temp_protein_not_in_range = np.array(temp_protein_not_in_range)
-            temp_protein_in_range = allGW_indx[~np.isin(allGW_indx,temp_protein_not_in_range)]
-            if j==0:
-                master_point_list = temp_protein_in_range
-            elif j>0:
-                master_point_list = np.unique(np.append(master_point_list,temp_protein_in_range))
-
-            temp_fC_value = (master_point_list.shape[0])/(self.GW_points.shape[0])
-
-            fC_vary_protein.append(temp_fC_value)
-
-            j+=1
+                #protein_snaps is the number of snapshots seen so far
+                protein_snaps.append(accumulator.n_snapshots)
+                fC_vary_protein.append(accumulator.fC)
+            return {'protein_snaps':protein_snaps,'fC':fC_vary_protein}
+        curve = self._cached('vary_protein',(self.GW_points.shape[0],interv),compute)
+        protein_snaps,fC_vary_protein = curve['protein_snaps'],curve['fC']
             
         ax.scatter(protein_snaps,
                    fC_vary_protein,
@@ -523,6 +836,1410 @@ class PyConforMap():
                color='darkorange')
         self.plot_style(ax,f'number of {protein_lab} snapshots',
                         '$f_C$',fontsize = 19, labelsize = 22, rotation = 45)
+    def coverage_accumulator(self,protein_rg_mean=None):
+        #returns a GWCoverageAccumulator over the current GW points, radius and transformation
+        #by default the protein/polymer Rg_mean of this instance is used; for a simulation that is
+        #still running, a fixed protein_rg_mean (e.g. from a previous run) can be provided instead
+        if protein_rg_mean is None:
+            protein_rg_mean = self.protein_rg_mean
+        return GWCoverageAccumulator(self.tree_GW,self.GW_points.shape[0],protein_rg_mean,
+                                     self.GW_mean,self.GW_std,self.radius_)
 
-        #re-initialize the self.GW_points and self.protein_points AND other data
-        self.organize_data(self.protein_rg2,self.protein_ree2,self.upto_protein_snapshots,self.GW_every_ith_snap)
+    @_timed_stage('fC_sliding_window')
+    def fC_sliding_window(self,window,step=1):
+        #fC of the protein/polymer snapshots [start:start+window], for start = 0, step, 2*step, ...
+        #(e.g. a 10 ns window sliding by 1 ns), against the current GW points
+        #a GWWindowCoverage keeps, for every GW point, the number of snapshots in the window within range of it,
+        #so moving the window only touches the GW neighbors of the snapshots that enter and leave it
+        #returns a dataframe with the window start and end snapshot (end excluded) and fC of every full window
+        def compute():
+            coverage = self.window_coverage(window)
+            window_end,fC_window = [],[]
+            if self._stdd_protein_var.shape[0]>=window:
+                #fill the first window, then move it step snapshots at a time
+                window_end.append(window)
+                fC_window.append(coverage.add_points(self._stdd_protein_var[:window]))
+                for no_snapshots,fC in coverage.slide_points(self._stdd_protein_var[window:],step=step):
+                    #a last, incomplete step is left out so that every window starts at a multiple of step
+                    if (no_snapshots-window)%step==0:
+                        window_end.append(no_snapshots)
+                        fC_window.append(fC)
+            return {'window_end':np.asarray(window_end,dtype=int),'fC':np.asarray(fC_window,dtype=float)}
+        curve = self._cached('fC_sliding_window',(self.GW_points.shape[0],window,step),compute)
+        return pd.DataFrame({'window_start':curve['window_end']-window,'window_end':curve['window_end'],'fC':curve['fC']})
+
+    @_timed_stage('approximate_fC')
+    def approximate_fC(self,tolerance=0.005,time_budget=None,confidence=0.95,bins=16,initial_sample=2048,seed=0):
+        #estimate of fC from a stratified random sample of the current GW points, with a confidence interval
+        #the GW points are split into strata over the (Rg/Rg_mean, ratio) plane (see GWReference.strata) and every
+        #stratum is sampled in proportion to its size; the sample is doubled until the half width of the
+        #confidence interval is at most tolerance, time_budget (seconds) has run out or every GW point was
+        #evaluated (the result is then exact); fC_using_cdist remains the exact computation
+        start_time = time.perf_counter()
+        z = NormalDist().inv_cdf(0.5+confidence/2)
+        n_GW = self.GW_points.shape[0]
+        #strata of the reference the current GW points come from (see organize_data)
+        order,stratum_starts,stratum_sizes = self._organized_GW_reference.strata(n_GW,bins,seed)
+        weights = stratum_sizes/n_GW
+        no_sampled = np.zeros(len(stratum_sizes),dtype=int)
+        no_covered = np.zeros(len(stratum_sizes))
+        sample_fraction = min(initial_sample/n_GW,1)
+        while True:
+            #every non-empty stratum gets at least one GW point, and the sample of a stratum only ever grows
+            target = np.minimum(np.ceil(sample_fraction*stratum_sizes).astype(int),stratum_sizes)
+            new_GW_indx = order[np.concatenate([np.arange(first+done,first+total) for first,done,total in
+                                                zip(stratum_starts,no_sampled,target)])]
+            GW_in_range = self.coverage_mask(self.tree_protein,self.GW_points[new_GW_indx])
+            no_covered += np.bincount(np.repeat(np.arange(len(target)),target-no_sampled),
+                                      weights=GW_in_range,minlength=len(target))
+            no_sampled = target
+
+            fC = float(np.sum(weights*no_covered/no_sampled))
+            #stratified variance with finite population correction; the covered fraction of a stratum is
+            #smoothed (+1 covered, +1 not covered) so that small strata seen as all or nothing still add variance
+            smoothed = (no_covered+1)/(no_sampled+2)
+            variance = np.sum(weights**2*smoothed*(1-smoothed)/no_sampled*(1-no_sampled/stratum_sizes))
+            half_width = float(z*variance**0.5)
+            exact = bool(np.all(no_sampled==stratum_sizes))
+            if (exact or half_width<=tolerance or
+                    (time_budget is not None and time.perf_counter()-start_time>=time_budget)):
+                break
+            sample_fraction = min(2*sample_fraction,1)
+        return {'fC':fC,'ci_low':max(fC-half_width,0),'ci_high':min(fC+half_width,1),'half_width':half_width,
+                'confidence':confidence,'n_evaluated':int(no_sampled.sum()),'n_GW':n_GW,'exact':exact}
+
+    @_timed_stage('bootstrap_fC')
+    def bootstrap_fC(self,n_replicates=1000,block_length=None,confidence=0.95,seed=None,workers=1):
+        #block-bootstrap confidence interval of fC for the current protein/polymer and GW points
+        #the GW neighborhood of every protein/polymer snapshot is found once (GW_neighborhoods), after which every
+        #replicate is a union of neighborhoods (see block_bootstrap_fC); with a seed the result is reproducible,
+        #and is kept in the result cache, if any
+        def compute():
+            indptr,indices = GW_neighborhoods(self.tree_GW,self.protein_points,self.radius_)
+            return block_bootstrap_fC(indptr,indices,self.GW_points.shape[0],n_replicates=n_replicates,
+                                      block_length=block_length,confidence=confidence,seed=seed,workers=workers)
+        if seed is None:
+            return compute()
+        fC_bootstrap = self._cached('bootstrap_fC',self._snapshot_limits()+(n_replicates,block_length,confidence,seed),
+                                    compute)
+        #arrays from the cache are turned back into numbers
+        return {name:(value if name=='replicates' else value.item()) if isinstance(value,np.ndarray) else value
+                for name,value in fC_bootstrap.items()}
+
+    def window_coverage(self,window,protein_rg_mean=None):
+        #returns a GWWindowCoverage over the current GW points, radius and transformation, which keeps the fC
+        #of the last window protein/polymer snapshots added to it (see coverage_accumulator for protein_rg_mean)
+        if protein_rg_mean is None:
+            protein_rg_mean = self.protein_rg_mean
+        return GWWindowCoverage(self.tree_GW,self.GW_points.shape[0],window,protein_rg_mean,
+                                self.GW_mean,self.GW_std,self.radius_)
+        
+
+class GWReference():
+
+    """
+     The reference GW chain data together with everything derived from it that does not depend on the
+     protein/polymer: the instantaneous shape ratio, the mean and stdev values used to transform coordinates,
+     the transformed GW coordinates and the KD-trees of the GW points. These are computed once and reused
+     by every organize_data call, and references loaded from a file are shared between instances
+     (see load_GW_reference).
+
+    ...
+
+    Attributes
+    ----------
+    GW_df : pandas dataframe
+        The GW reference simulation, with the 'ratio' column added if it was missing
+        
+    GW_mean : array of shape (2,)
+        Mean of Rg/Rg_mean and of the instantaneous shape ratio over the first 720,001 GW snapshots
+        
+    GW_std : array of shape (2,)
+        Stdev of Rg/Rg_mean and of the instantaneous shape ratio over the first 720,001 GW snapshots
+        
+    GW_points : array of shape (n,2)
+        Transformed coordinates of all GW snapshots
+        
+    Methods
+    -------
+    points
+        - transformed coordinates of the first GW snapshots
+        
+    tree
+        - KD-tree of the first GW snapshots (the most recently used ones are kept)
+
+    density_raster
+        - 2D histogram of the GW points for density plots (the most recently used ones are kept)
+
+    histograms
+        - probability densities of the GW Rg/Rg_mean and shape ratio values (the most recently used ones are kept)
+
+    strata
+        - GW snapshots grouped into strata over the (Rg/Rg_mean, ratio) plane, in random order within each stratum
+
+    fingerprint
+        - hash of the GW points, used in ResultCache keys
+        
+    """
+
+    def __init__(self,GW_df,GW_mean=None,GW_std=None,GW_points=None):
+        #GW_mean, GW_std and GW_points can be provided when they were precomputed (binary reference files)
+        if 'ratio' not in GW_df.columns:
+            GW_df['ratio'] = GW_df['Rend2'].values/GW_df['Rg2'].values
+        self.GW_df = GW_df
+
+        #calculate mean and stdev values (must keep same mean and stdev values)
+        #calculating mean and stdev values of Rg/Rg_mean and shape ratio for GW
+        upto_snapshots=720000
+        GW_x = self.GW_df['Rg/Rg_mean'].values
+        GW_y = self.GW_df['ratio'].values
+        if GW_mean is None or GW_std is None:
+            GW_mean=[np.mean(GW_x[0:(upto_snapshots+1)]),np.mean(GW_y[0:(upto_snapshots+1)])]
+            GW_std=[np.std(GW_x[0:(upto_snapshots+1)]),np.std(GW_y[0:(upto_snapshots+1)])]
+        self.GW_mean=np.array(GW_mean,dtype=float)
+        self.GW_std=np.array(GW_std,dtype=float)
+
+        #stdd just means transformed or standardized
+        if GW_points is None:
+            GW_points=np.c_[(GW_x-self.GW_mean[0])/self.GW_std[0],
+                            (GW_y-self.GW_mean[1])/self.GW_std[1]]
+        self.GW_points=GW_points
+        self._trees = OrderedDict()
+        self._plot_data = OrderedDict()
+        #tile layout of tiled binary reference files (see tile_GW_reference), None otherwise
+        self.tiles = None
+        self._fingerprint = None
+        
+    def points(self,GW_every_ith_snap):
+        #a view, not a copy
+        return self.GW_points[:GW_every_ith_snap]
+        
+    def tree(self,GW_every_ith_snap):
+        n_GW = len(self.points(GW_every_ith_snap))
+        if n_GW in self._trees:
+            self._trees.move_to_end(n_GW)
+        else:
+            self._trees[n_GW] = spatial.cKDTree(self.points(n_GW))
+            if len(self._trees)>GW_TREE_CACHE_SIZE:
+                self._trees.popitem(last=False)
+        return self._trees[n_GW]
+
+    def fingerprint(self):
+        #hash of the transformed GW points and the transformation, computed once (see ResultCache)
+        if self._fingerprint is None:
+            self._fingerprint = result_cache_key(self.GW_points,self.GW_mean,self.GW_std)
+        return self._fingerprint
+
+    def _cached_plot_data(self,key,compute):
+        #plot data and strata of the GW_TREE_CACHE_SIZE most recently used keys (axis limits and bins) are kept
+        if key in self._plot_data:
+            self._plot_data.move_to_end(key)
+        else:
+            self._plot_data[key] = compute()
+            if len(self._plot_data)>GW_TREE_CACHE_SIZE:
+                self._plot_data.popitem(last=False)
+        return self._plot_data[key]
+
+    def density_raster(self,xmin,xmax,ymin,ymax,bins):
+        #2D histogram (counts, x edges, y edges) of the GW Rg/Rg_mean and shape ratio values over the axis limits
+        x_edges = np.linspace(xmin,xmax,bins+1)
+        y_edges = np.linspace(ymin,ymax,bins+1)
+        return self._cached_plot_data(('raster',xmin,xmax,ymin,ymax,bins),
+                                      lambda: np.histogram2d(self.GW_df['Rg/Rg_mean'].values,self.GW_df['ratio'].values,
+                                                             bins=[x_edges,y_edges]))
+
+    def histograms(self,xbins,ybins):
+        #probability densities of the GW Rg/Rg_mean and shape ratio values over the given bin edges
+        return self._cached_plot_data(('histograms',tuple(xbins),tuple(ybins)),
+                                      lambda: (np.histogram(self.GW_df['Rg/Rg_mean'].values,bins=xbins,density=True)[0],
+                                               np.histogram(self.GW_df['ratio'].values,bins=ybins,density=True)[0]))
+
+    def strata(self,GW_every_ith_snap,bins=16,seed=0):
+        #groups the first GW snapshots into bins x bins strata, using bins quantiles of the transformed Rg/Rg_mean
+        #and bins quantiles of the transformed shape ratio, so every stratum row and column holds about as many
+        #GW points; returns (GW indices ordered by stratum and randomly within a stratum, start of every stratum
+        #in that order, number of GW points per stratum), without empty strata
+        #taking the first n indices of a stratum is therefore a random sample without replacement of it
+        def compute():
+            GW_points = self.points(GW_every_ith_snap)
+            quantiles = np.linspace(0,1,bins+1)[1:-1]
+            stratum = (np.searchsorted(np.quantile(GW_points[:,0],quantiles),GW_points[:,0],side='right')*bins+
+                       np.searchsorted(np.quantile(GW_points[:,1],quantiles),GW_points[:,1],side='right'))
+            random_key = np.random.default_rng(seed).random(GW_points.shape[0])
+            order = np.lexsort((random_key,stratum))
+            stratum_sizes = np.bincount(stratum,minlength=bins*bins)
+            stratum_starts = np.concatenate([[0],np.cumsum(stratum_sizes)[:-1]])
+            return order,stratum_starts[stratum_sizes>0],stratum_sizes[stratum_sizes>0]
+        return self._cached_plot_data(('strata',len(self.points(GW_every_ith_snap)),bins,seed),compute)
+
+
+def load_GW_reference(GW_file=DEFAULT_GW_FILE):
+    #returns the GWReference for a GW reference chain csv file
+    #references are cached by absolute path, modification time and size, so a file is only parsed
+    #(and its trees built) again after it changes; the least recently used references are dropped
+    #once more than GW_CACHE_SIZE are held
+    #files starting with GW_BINARY_MAGIC are opened as (memory-mapped) binary references, anything else as csv
+    file_stat = os.stat(GW_file)
+    key = (os.path.abspath(GW_file),file_stat.st_mtime_ns,file_stat.st_size)
+    if key in _GW_reference_cache:
+        _GW_reference_cache.move_to_end(key)
+        return _GW_reference_cache[key]
+    with open(GW_file,'rb') as f:
+        is_binary = f.read(len(GW_BINARY_MAGIC))==GW_BINARY_MAGIC
+    if is_binary:
+        reference = read_GW_reference_binary(GW_file)
+    else:
+        reference = GWReference(pd.read_csv(GW_file))
+    _GW_reference_cache[key] = reference
+    if len(_GW_reference_cache)>GW_CACHE_SIZE:
+        _GW_reference_cache.popitem(last=False)
+    return reference
+
+
+def points_within_radius(tree,query_points,radius_,workers=-1):
+    #returns a boolean array with one entry per query point, True if the tree holds at least one point
+    #within radius_ of it (same inclusive test as query_ball_point)
+    #only the nearest neighbor is needed, and the search is cut off beyond the radius so it stays cheap
+    #the upper bound is nudged up by one ulp because the cut-off in query is strict
+    query_points = np.asarray(query_points)
+    if query_points.shape[0]==0:
+        return np.zeros(0,dtype=bool)
+    upper_bound = np.nextafter(radius_,np.inf)
+    nearest_dist,_ = tree.query(query_points,k=1,distance_upper_bound=upper_bound,workers=workers)
+    return nearest_dist<=radius_
+
+
+def points_within_radius_grid(tree,query_points,radius_,workers=-1):
+    #same result as points_within_radius, computed on a grid of square cells of side radius_/2 laid over the
+    #query points: the tree is searched once per occupied cell (from its center) instead of once per point
+    #a cell whose center is within radius_ minus the half cell diagonal of a tree point is covered as a whole,
+    #a cell whose center is farther than radius_ plus the half cell diagonal from every tree point is not covered
+    #at all, and only the points of the remaining (boundary) cells are checked exactly
+    #the work and memory depend on the number of occupied cells rather than on the number of query points
+    query_points = np.asarray(query_points)
+    in_range = np.zeros(query_points.shape[0],dtype=bool)
+    if query_points.shape[0]==0 or tree.n==0:
+        return in_range
+    cell_size = radius_/2
+    half_diagonal = cell_size*np.sqrt(2)/2
+    #cells this close to the classification thresholds are treated as boundary cells (rounding safety)
+    margin = 1e-9*max(1.0,radius_)
+
+    #cells are numbered row by row; occupied cells are found with a dense lookup table over the grid,
+    #or by sorting the cell numbers if the grid is very large (widely spread query points)
+    origin = query_points.min(axis=0)
+    cell_indx = np.floor((query_points-origin)/cell_size).astype(np.int64)
+    n_rows = int(cell_indx[:,1].max())+1
+    cell_number = cell_indx[:,0]*n_rows+cell_indx[:,1]
+    n_cells = (int(cell_indx[:,0].max())+1)*n_rows
+    if n_cells<=GRID_MAX_CELLS:
+        cell_lookup = np.zeros(n_cells,dtype=np.int64)
+        cell_lookup[cell_number] = 1
+        cells = np.flatnonzero(cell_lookup)
+        cell_lookup[cells] = np.arange(cells.shape[0])
+        point_cell = cell_lookup[cell_number]
+    else:
+        cells,point_cell = np.unique(cell_number,return_inverse=True)
+    cell_centers = origin+(np.c_[cells//n_rows,cells%n_rows]+0.5)*cell_size
+
+    nearest_dist,_ = tree.query(cell_centers,k=1,distance_upper_bound=radius_+half_diagonal+2*margin,
+                                workers=workers)
+    cell_covered = nearest_dist<=radius_-half_diagonal-margin
+    cell_boundary = ~cell_covered&(nearest_dist<=radius_+half_diagonal+margin)
+
+    in_range[cell_covered[point_cell]] = True
+    boundary_points = np.flatnonzero(cell_boundary[point_cell])
+    in_range[boundary_points] = points_within_radius(tree,query_points[boundary_points],radius_,workers=workers)
+    return in_range
+
+
+def fraction_within_radii(tree,query_points,radii=None,workers=-1):
+    #fraction of query points with at least one tree point within each of the radii (inclusive, as in
+    #points_within_radius), from a single nearest-neighbor search: sorted nearest distances are a CDF
+    #returns (radii, fractions); with radii=None, the radii are all distinct nearest distances (exact curve)
+    query_points = np.asarray(query_points)
+    nearest_dist,_ = tree.query(query_points,k=1,workers=workers)
+    nearest_dist = np.sort(nearest_dist)
+    if radii is None:
+        radii = np.unique(nearest_dist[np.isfinite(nearest_dist)])
+    radii = np.asarray(radii,dtype=float)
+    return radii,np.searchsorted(nearest_dist,radii,side='right')/max(query_points.shape[0],1)
+
+
+def transform_protein_data(rg2,ree2,protein_rg_mean,GW_mean,GW_std):
+    #transformed (Rg/Rg_mean, ins. shape ratio) coordinates of protein/polymer snapshots, as in
+    #PyConforMap.organize_data: Rg is divided by the protein/polymer Rg_mean, then both coordinates are
+    #transformed with the GW mean and stdev values
+    rg2 = np.asarray(rg2,dtype=float)
+    ree2 = np.asarray(ree2,dtype=float)
+    points = np.c_[rg2**0.5/protein_rg_mean, ree2/rg2]
+    return (points-GW_mean)/GW_std
+
+
+def read_protein_data(protein):
+    #Rg2 and Ree2 arrays of a protein/polymer given as a csv file (same layout as the PyConforMap input),
+    #as an array of shape (n,2) with Rg2 in the first column and Ree2 in the second, or as a .npy file or
+    #array of per-frame coordinates (see iter_protein_chunks)
+    if isinstance(protein,(str,os.PathLike)) and not os.fspath(protein).endswith('.npy'):
+        df_conf = pd.read_csv(protein)
+        return df_conf.iloc[:,0].values,df_conf.iloc[:,1].values
+    if not isinstance(protein,(str,os.PathLike)) and np.ndim(protein)==2:
+        protein = np.asarray(protein,dtype=float)
+        return protein[:,0],protein[:,1]
+    chunks = list(iter_protein_chunks(protein))
+    return np.concatenate([rg2 for rg2,_ in chunks]),np.concatenate([ree2 for _,ree2 in chunks])
+
+
+def iter_protein_chunks(protein,chunksize=PROTEIN_CHUNK_SIZE):
+    #yields (Rg2, Ree2) arrays for consecutive chunks of chunksize snapshots, so that a trajectory never
+    #has to be in memory as a whole
+    #protein can be a csv file (same layout as the PyConforMap input), a .npy file (memory-mapped) or an array;
+    #arrays can hold Rg2 and Ree2 values, shape (n,2), or per-frame coordinates, shape (n frames, n atoms, 3),
+    #e.g. C-alpha coordinates, in which case Rg2 and Ree2 are computed per chunk (see conformation_rg2_ree2)
+    if isinstance(protein,(str,os.PathLike)) and not os.fspath(protein).endswith('.npy'):
+        for chunk in pd.read_csv(protein,chunksize=chunksize):
+            yield chunk.iloc[:,0].values,chunk.iloc[:,1].values
+        return
+    if isinstance(protein,(str,os.PathLike)):
+        protein = np.load(protein,mmap_mode='r')
+    for start in range(0,protein.shape[0],chunksize):
+        chunk = np.asarray(protein[start:start+chunksize],dtype=float)
+        if chunk.ndim==3:
+            yield conformation_rg2_ree2(chunk)
+        else:
+            yield chunk[:,0],chunk[:,1]
+
+
+def stream_score_protein(protein,reference=DEFAULT_GW_FILE,radius_=0.1,GW_every_ith_snap=None,
+                         chunksize=PROTEIN_CHUNK_SIZE,protein_rg_mean=None,workers=-1,return_coverage=False,
+                         bootstrap=0,block_length=None,confidence=0.95,seed=None):
+    #same as score_protein, for a protein/polymer read chunk by chunk with iter_protein_chunks, so memory use
+    #is bounded by the chunk size and the GW reference however long the trajectory is
+    #a first, lightweight pass computes the protein/polymer Rg_mean (skipped if protein_rg_mean is given),
+    #a second pass adds the transformed chunks to a GWCoverageAccumulator and counts the bounded snapshots
+    #reference is a GWReference or a GW reference file (csv or binary)
+    #with bootstrap, the GW neighborhoods of all snapshots are kept for the resampling (see score_protein)
+    if not isinstance(reference,GWReference):
+        reference = load_GW_reference(reference)
+    if GW_every_ith_snap is None:
+        GW_every_ith_snap = reference.GW_points.shape[0]
+    if protein_rg_mean is None:
+        rg_sum = 0.0
+        n_snapshots = 0
+        for rg2,_ in iter_protein_chunks(protein,chunksize):
+            rg_sum += np.sum(np.asarray(rg2,dtype=float)**0.5)
+            n_snapshots += len(rg2)
+        protein_rg_mean = rg_sum/n_snapshots
+
+    tree_GW = reference.tree(GW_every_ith_snap)
+    accumulator = GWCoverageAccumulator(tree_GW,tree_GW.n,protein_rg_mean,reference.GW_mean,reference.GW_std,
+                                        radius_,workers=workers)
+    n_bounded = 0
+    no_neighbors,neighbor_indices = [],[]
+    for rg2,ree2 in iter_protein_chunks(protein,chunksize):
+        protein_points = transform_protein_data(rg2,ree2,protein_rg_mean,reference.GW_mean,reference.GW_std)
+        accumulator.add_points(protein_points)
+        n_bounded += np.count_nonzero(points_within_radius(tree_GW,protein_points,radius_,workers=workers))
+        if bootstrap:
+            indptr,indices = GW_neighborhoods(tree_GW,protein_points,radius_,workers=workers)
+            no_neighbors.append(np.diff(indptr))
+            neighbor_indices.append(indices)
+    scores = {'n_snapshots':accumulator.n_snapshots,
+              'protein_rg_mean':protein_rg_mean,
+              'fC':accumulator.fC,
+              'bounded_fraction':n_bounded/accumulator.n_snapshots}
+    if return_coverage:
+        scores['coverage'] = accumulator.coverage_bitset()
+    if bootstrap:
+        indptr = np.concatenate([[0],np.cumsum(np.concatenate(no_neighbors))])
+        _add_bootstrap_scores(scores,indptr,np.concatenate(neighbor_indices),tree_GW.n,bootstrap,block_length,
+                              confidence,seed)
+    return scores
+
+
+def _add_bootstrap_scores(scores,indptr,indices,n_GW,bootstrap,block_length,confidence,seed):
+    #bootstrap replicates are evaluated in this process, since the proteins are already spread over processes
+    fC_bootstrap = block_bootstrap_fC(indptr,indices,n_GW,n_replicates=bootstrap,block_length=block_length,
+                                      confidence=confidence,seed=seed,workers=1)
+    scores['fC_ci_low'] = fC_bootstrap['ci_low']
+    scores['fC_ci_high'] = fC_bootstrap['ci_high']
+    scores['fC_std'] = fC_bootstrap['std']
+
+
+def score_protein(rg2,ree2,reference,radius_=0.1,GW_every_ith_snap=None,workers=-1,return_coverage=False,
+                  bootstrap=0,block_length=None,confidence=0.95,seed=None):
+    #fC and bounded fraction of one protein/polymer against a GWReference, without plotting or printing
+    #same values as PyConforMap.fC_using_cdist and check_boundary with all protein/polymer snapshots
+    #with return_coverage, the GW points covered by the protein/polymer are also returned, packed into
+    #bits with np.packbits (see landscape_overlap)
+    #with bootstrap > 0, that many block-bootstrap replicates give a confidence interval (fC_ci_low, fC_ci_high)
+    #and a stdev (fC_std) of fC (see block_bootstrap_fC)
+    if GW_every_ith_snap is None:
+        GW_every_ith_snap = reference.GW_points.shape[0]
+    protein_rg_mean = np.mean(np.asarray(rg2,dtype=float)**0.5)
+    protein_points = transform_protein_data(rg2,ree2,protein_rg_mean,reference.GW_mean,reference.GW_std)
+    GW_points = reference.points(GW_every_ith_snap)
+    tree_protein = spatial.cKDTree(protein_points)
+    GW_in_range = points_within_radius(tree_protein,GW_points,radius_,workers=workers)
+    protein_in_range = points_within_radius(reference.tree(GW_every_ith_snap),protein_points,radius_,workers=workers)
+    scores = {'n_snapshots':protein_points.shape[0],
+              'protein_rg_mean':protein_rg_mean,
+              'fC':np.count_nonzero(GW_in_range)/GW_points.shape[0],
+              'bounded_fraction':np.count_nonzero(protein_in_range)/protein_points.shape[0]}
+    if return_coverage:
+        scores['coverage'] = np.packbits(GW_in_range)
+    if bootstrap:
+        tree_GW = reference.tree(GW_every_ith_snap)
+        _add_bootstrap_scores(scores,*GW_neighborhoods(tree_GW,protein_points,radius_,workers=workers),tree_GW.n,
+                              bootstrap,block_length,confidence,seed)
+    return scores
+
+
+#GW reference of a score_proteins worker process, set once per process by _init_scoring_worker
+_scoring_reference = None
+
+
+def _init_scoring_worker(reference):
+    global _scoring_reference
+    if isinstance(reference,GWReference):
+        _scoring_reference = reference
+    else:
+        _scoring_reference = load_GW_reference(reference)
+
+
+def _score_protein_task(protein,radius_,GW_every_ith_snap,chunksize=None,return_coverage=False,bootstrap=None):
+    #one worker process per core, so the tree searches inside a task use a single thread
+    #bootstrap is None or the bootstrap arguments of score_protein (bootstrap, block_length, confidence, seed)
+    bootstrap = bootstrap or {}
+    if chunksize is not None:
+        return stream_score_protein(protein,_scoring_reference,radius_=radius_,GW_every_ith_snap=GW_every_ith_snap,
+                                    chunksize=chunksize,workers=1,return_coverage=return_coverage,**bootstrap)
+    rg2,ree2 = read_protein_data(protein)
+    return score_protein(rg2,ree2,_scoring_reference,radius_=radius_,GW_every_ith_snap=GW_every_ith_snap,workers=1,
+                         return_coverage=return_coverage,**bootstrap)
+
+
+def score_proteins(proteins,radius_=0.1,GW_file=DEFAULT_GW_FILE,GW_every_ith_snap=None,labels=None,workers=None,
+                   chunksize=None,return_coverage=False,bootstrap=0,block_length=None,confidence=0.95,seed=None):
+    #scores many proteins/polymers against one GW reference and returns a results dataframe
+    #proteins is a list of csv files, (n,2) arrays of Rg2 and Ree2 values and/or per-frame coordinates
+    #(.npy files or arrays, see iter_protein_chunks); with chunksize, each protein is read chunk by chunk
+    #(see stream_score_protein)
+    #GW_file is a GW reference file (csv or binary) or a GWReference; every worker process loads it
+    #(or receives it) once, and the proteins are spread over the processes (workers=None uses all cores,
+    #workers=1 scores everything in this process)
+    #nothing is plotted or printed; one row per protein, in the given order
+    #with return_coverage, (results, coverage) is returned, where row i of the uint8 array coverage holds the GW
+    #points covered by protein i packed into bits (about 90 KB per protein for 720,000 GW points,
+    #see landscape_overlap)
+    #with bootstrap > 0, the block-bootstrap confidence interval and stdev of every fC are added as the columns
+    #fC_ci_low, fC_ci_high and fC_std (see block_bootstrap_fC); every protein gets its own stream spawned from
+    #np.random.SeedSequence(seed), so the results do not depend on workers
+    if labels is None:
+        labels = [os.path.splitext(os.path.basename(protein))[0] if isinstance(protein,(str,os.PathLike))
+                  else f'protein_{i}' for i,protein in enumerate(proteins)]
+    if bootstrap:
+        bootstrap_args = [{'bootstrap':bootstrap,'block_length':block_length,'confidence':confidence,'seed':protein_seed}
+                          for protein_seed in _as_seed_sequence(seed).spawn(len(proteins))]
+    else:
+        bootstrap_args = [None]*len(proteins)
+    if workers==1:
+        _init_scoring_worker(GW_file)
+        scores = [_score_protein_task(protein,radius_,GW_every_ith_snap,chunksize,return_coverage,protein_bootstrap)
+                  for protein,protein_bootstrap in zip(proteins,bootstrap_args)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers,initializer=_init_scoring_worker,
+                                 initargs=(GW_file,)) as executor:
+            scores = list(executor.map(_score_protein_task,proteins,[radius_]*len(proteins),
+                                       [GW_every_ith_snap]*len(proteins),[chunksize]*len(proteins),
+                                       [return_coverage]*len(proteins),bootstrap_args))
+    columns = ['n_snapshots','protein_rg_mean','fC','bounded_fraction']
+    if bootstrap:
+        columns += ['fC_ci_low','fC_ci_high','fC_std']
+    results = pd.DataFrame(scores,columns=columns)
+    results.insert(0,'protein',list(labels))
+    if return_coverage:
+        return results,np.array([score['coverage'] for score in scores])
+    return results
+
+
+#protein/polymer data of a tiled_score_protein worker process, set once per process by _init_tile_worker
+_tile_scoring = None
+
+
+def _init_tile_worker(GW_file,protein_points,radius_,workers):
+    global _tile_scoring
+    _tile_scoring = (load_GW_reference(GW_file),protein_points,radius_,workers)
+
+
+def _score_tile_task(tile_start,tile_stop):
+    #GW points of one tile, read from the memory-mapped file, against the protein/polymer points in its halo
+    #returns the number of covered GW points and the indices of the protein points bounded by this tile
+    reference,protein_points,radius_,workers = _tile_scoring
+    GW_points = np.array(reference.GW_points[tile_start:tile_stop])
+    #halo: every protein point within radius_ (plus a margin against rounding) of the box around the tile's
+    #points; protein_points is sorted by Rg/Rg_mean, so the x range is found by bisection
+    halo = radius_*(1+1e-9)+1e-9
+    lowest = GW_points.min(axis=0)-halo
+    highest = GW_points.max(axis=0)+halo
+    first = np.searchsorted(protein_points[:,0],lowest[0],side='left')
+    last = np.searchsorted(protein_points[:,0],highest[0],side='right')
+    protein_indx = first+np.flatnonzero((protein_points[first:last,1]>=lowest[1])&
+                                        (protein_points[first:last,1]<=highest[1]))
+    if protein_indx.shape[0]==0:
+        return 0,protein_indx
+    halo_points = protein_points[protein_indx]
+    n_covered = np.count_nonzero(points_within_radius(spatial.cKDTree(halo_points),GW_points,radius_,workers=workers))
+    protein_in_range = points_within_radius(spatial.cKDTree(GW_points),halo_points,radius_,workers=workers)
+    return n_covered,protein_indx[protein_in_range]
+
+
+def tiled_score_protein(rg2,ree2,GW_file,radius_=0.1,workers=None,protein_rg_mean=None):
+    #same as score_protein with all GW snapshots, for a tiled reference file (see tile_GW_reference) that may be
+    #larger than memory: the GW points are read one tile at a time and only searched against the protein/polymer
+    #points within radius_ of the tile (its halo), so memory use is bounded by the largest tile and the
+    #protein/polymer data; every distance is computed as in the in-memory path, so the results are the same
+    #the tiles are spread over workers processes (None uses all cores, 1 reads every tile in this process)
+    reference = load_GW_reference(GW_file)
+    if reference.tiles is None:
+        raise ValueError(f'{GW_file} is not a tiled GW reference file (see tile_GW_reference)')
+    if protein_rg_mean is None:
+        protein_rg_mean = np.mean(np.asarray(rg2,dtype=float)**0.5)
+    protein_points = transform_protein_data(rg2,ree2,protein_rg_mean,reference.GW_mean,reference.GW_std)
+    protein_points = protein_points[np.argsort(protein_points[:,0],kind='stable')]
+    tile_starts = reference.tiles['starts']
+    tile_ranges = [(start,stop) for start,stop in zip(tile_starts[:-1],tile_starts[1:]) if stop>start]
+
+    if workers==1:
+        _init_tile_worker(GW_file,protein_points,radius_,-1)
+        tile_scores = [_score_tile_task(start,stop) for start,stop in tile_ranges]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers,initializer=_init_tile_worker,
+                                 initargs=(GW_file,protein_points,radius_,1)) as executor:
+            tile_scores = list(executor.map(_score_tile_task,*zip(*tile_ranges)))
+    protein_in_range = np.zeros(protein_points.shape[0],dtype=bool)
+    for _,protein_indx in tile_scores:
+        protein_in_range[protein_indx] = True
+    return {'n_snapshots':protein_points.shape[0],
+            'protein_rg_mean':protein_rg_mean,
+            'fC':sum(n_covered for n_covered,_ in tile_scores)/reference.GW_points.shape[0],
+            'bounded_fraction':np.count_nonzero(protein_in_range)/protein_points.shape[0]}
+
+
+def GW_neighborhoods(tree_GW,protein_points,radius_,workers=-1):
+    #GW points within radius_ of every protein/polymer point, in compressed sparse row form:
+    #the GW indices of point i are indices[indptr[i]:indptr[i+1]]
+    #the points are searched WINDOW_QUERY_BLOCK at a time, which bounds the memory used by the python lists
+    index_dtype = np.int32 if tree_GW.n<2**31 else np.int64
+    counts,indices = [],[]
+    for start in range(0,len(protein_points),WINDOW_QUERY_BLOCK):
+        neighbors = tree_GW.query_ball_point(protein_points[start:start+WINDOW_QUERY_BLOCK],radius_,
+                                             workers=workers,return_sorted=False)
+        counts.append(np.fromiter(map(len,neighbors),dtype=np.int64,count=len(neighbors)))
+        indices.append(np.fromiter(chain.from_iterable(neighbors),dtype=index_dtype))
+    counts = np.concatenate(counts) if counts else np.zeros(0,dtype=np.int64)
+    indptr = np.concatenate([[0],np.cumsum(counts)])
+    return indptr,(np.concatenate(indices) if indices else np.zeros(0,dtype=index_dtype))
+
+
+def _GW_occurrences(indptr,indices,n_GW):
+    #the GW neighborhoods turned around: the frames that have GW point g as a neighbor are
+    #frames_of_GW[GW_ptr[g]:GW_ptr[g+1]], int32 like the GW indices
+    #every GW point's frames are kept in the same fixed random order, not in time order, so that frames checked
+    #one after the other belong to different blocks (this only affects how soon a drawn frame is found)
+    n_frames = indptr.shape[0]-1
+    GW_ptr = np.concatenate([[0],np.cumsum(np.bincount(indices,minlength=n_GW))])
+    next_position = GW_ptr[:-1].copy()
+    frames_of_GW = np.empty(indices.shape[0],dtype=np.int32 if n_frames<2**31 else np.int64)
+    for frame in np.random.default_rng(0).permutation(n_frames):
+        GW_indx = indices[indptr[frame]:indptr[frame+1]]
+        frames_of_GW[next_position[GW_indx]] = frame
+        next_position[GW_indx] += 1
+    return GW_ptr,frames_of_GW
+
+
+def _bootstrap_fC_replicates(GW_ptr,frames_of_GW,n_frames,block_length,n_replicates,seed_seq):
+    #fC of n_replicates moving-block bootstrap replicates, from the random stream seed_seq
+    #a replicate is made of ceil(n/block_length) blocks of consecutive frames with random starts, the last block
+    #cut so that the replicate has n frames; fC only depends on which frames were drawn, not how often
+    #a GW point is covered by a replicate if any of its frames was drawn, so its frames (see _GW_occurrences)
+    #are checked one at a time until a drawn one is found: about 2/3 of the frames are drawn, so most GW points
+    #are settled by their first frame or two, and every round only checks the GW points still unsettled
+    rng = np.random.default_rng(seed_seq)
+    n_GW = GW_ptr.shape[0]-1
+    n_blocks = -(-n_frames//block_length)
+    block_lengths = np.full(n_blocks,block_length)
+    block_lengths[-1] = n_frames-(n_blocks-1)*block_length
+    #GW points within the radius of at least one frame
+    touched = np.flatnonzero(np.diff(GW_ptr))
+    fC_replicates = np.empty(n_replicates)
+    for i in range(n_replicates):
+        block_starts = rng.integers(0,n_frames-block_length+1,size=n_blocks)
+        #frames covered by at least one block, from the running number of open blocks
+        open_blocks = (np.bincount(block_starts,minlength=n_frames+1)-
+                       np.bincount(block_starts+block_lengths,minlength=n_frames+1))
+        frame_drawn = np.cumsum(open_blocks[:n_frames])>0
+        #next frame to check and end of the frames of every unsettled GW point
+        position,end = GW_ptr[touched],GW_ptr[touched+1]
+        n_covered = 0
+        while position.shape[0]:
+            unsettled = ~frame_drawn[frames_of_GW[position]]
+            n_covered += unsettled.shape[0]-np.count_nonzero(unsettled)
+            position,end = position[unsettled]+1,end[unsettled]
+            unsettled = position<end
+            position,end = position[unsettled],end[unsettled]
+        fC_replicates[i] = n_covered/n_GW
+    return fC_replicates
+
+
+#neighborhoods of a block_bootstrap_fC worker process, set once per process by _init_bootstrap_worker
+_bootstrap_neighborhoods = None
+
+
+def _init_bootstrap_worker(GW_ptr,frames_of_GW,n_frames,block_length):
+    global _bootstrap_neighborhoods
+    _bootstrap_neighborhoods = (GW_ptr,frames_of_GW,n_frames,block_length)
+
+
+def _bootstrap_fC_task(n_replicates,seed_seq):
+    return _bootstrap_fC_replicates(*_bootstrap_neighborhoods,n_replicates,seed_seq)
+
+
+def block_bootstrap_fC(indptr,indices,n_GW,n_replicates=1000,block_length=None,confidence=0.95,seed=None,workers=1):
+    #moving-block bootstrap of fC over correlated protein/polymer frames, from their GW neighborhoods
+    #(see GW_neighborhoods); blocks of consecutive frames keep the correlation between neighboring frames
+    #block_length=None uses n_frames**(1/3) frames, a common choice
+    #the replicates are evaluated BOOTSTRAP_CHUNK_SIZE at a time, each chunk with its own stream spawned from
+    #np.random.SeedSequence(seed), in this process (workers=1) or in worker processes (workers=None uses all
+    #cores); the replicates only depend on seed, not on workers
+    #the neighborhoods are turned around once into the frames of every GW point (_GW_occurrences), so that a
+    #replicate checks GW points against the drawn frames instead of gathering the neighborhoods of every drawn frame
+    #a replicate holds only about 63% distinct frames, so replicate fCs are lower than the fC of all frames; the
+    #confidence interval is therefore the percentile interval of the replicates shifted by that bias (returned
+    #as bias), i.e. the spread of the replicates placed around the fC of all frames, clipped to [0, 1]
+    #returns a dictionary with fC, the confidence interval, the replicate stdev and bias and the replicates
+    n_frames = indptr.shape[0]-1
+    if n_frames==0:
+        raise ValueError('no protein/polymer frames to resample')
+    if block_length is None:
+        block_length = max(int(round(n_frames**(1/3))),1)
+    block_length = min(block_length,n_frames)
+    chunk_sizes = [min(BOOTSTRAP_CHUNK_SIZE,n_replicates-start) for start in range(0,n_replicates,BOOTSTRAP_CHUNK_SIZE)]
+    chunk_seeds = _as_seed_sequence(seed).spawn(len(chunk_sizes))
+    GW_ptr,frames_of_GW = _GW_occurrences(indptr,indices,n_GW)
+    if workers==1:
+        _init_bootstrap_worker(GW_ptr,frames_of_GW,n_frames,block_length)
+        fC_replicates = list(map(_bootstrap_fC_task,chunk_sizes,chunk_seeds))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers,initializer=_init_bootstrap_worker,
+                                 initargs=(GW_ptr,frames_of_GW,n_frames,block_length)) as executor:
+            fC_replicates = list(executor.map(_bootstrap_fC_task,chunk_sizes,chunk_seeds))
+    fC_replicates = np.concatenate(fC_replicates) if fC_replicates else np.zeros(0)
+    fC = np.count_nonzero(np.diff(GW_ptr))/n_GW
+    if n_replicates>0:
+        bias = float(np.mean(fC_replicates)-fC)
+        ci_low,ci_high = np.clip(np.quantile(fC_replicates,[(1-confidence)/2,(1+confidence)/2])-bias,0,1)
+    else:
+        bias,ci_low,ci_high = np.nan,np.nan,np.nan
+    return {'fC':float(fC),'ci_low':float(ci_low),'ci_high':float(ci_high),
+            'std':float(np.std(fC_replicates,ddof=1)) if n_replicates>1 else np.nan,'bias':bias,
+            'confidence':confidence,'block_length':block_length,'replicates':fC_replicates}
+
+
+def unpack_coverage(coverage,n_GW):
+    #boolean array (one entry per GW point) of a coverage packed with np.packbits
+    return np.unpackbits(coverage,count=n_GW,axis=-1).astype(bool)
+
+
+def _popcount(words):
+    #number of set bits of every uint64 word
+    if hasattr(np,'bitwise_count'):
+        return np.bitwise_count(words)
+    #numpy < 2.0: look the bits of every byte up in a table
+    byte_counts = np.unpackbits(np.arange(256,dtype=np.uint8)[:,None],axis=1).sum(axis=1).astype(np.uint8)
+    return byte_counts[words.view(np.uint8)].reshape(*words.shape,8).sum(axis=-1,dtype=np.uint8)
+
+
+def landscape_overlap(coverage,metric='jaccard',labels=None,block_bytes=2**26):
+    #N x N matrix comparing which GW points N proteins/polymers cover, from their packed coverages
+    #(rows of the array returned by score_proteins(..., return_coverage=True), or np.packbits of coverage masks)
+    #metric is 'jaccard' (GW points covered by both / covered by either), 'overlap' (covered by both / covered
+    #by the protein covering fewer) or 'intersection' (number of GW points covered by both)
+    #the packed bits are compared 64 at a time (bitwise and, then popcount), in blocks of rows holding
+    #about block_bytes bytes, so the unpacked masks are never held in memory
+    #returns an array, or a dataframe indexed by labels when labels are given
+    if metric not in ('jaccard','overlap','intersection'):
+        raise ValueError("metric must be 'jaccard', 'overlap' or 'intersection'")
+    coverage = np.atleast_2d(np.asarray(coverage,dtype=np.uint8))
+    n_proteins,n_bytes = coverage.shape
+    #pad every row to a whole number of uint64 words (the padding bits are zero)
+    words = np.zeros((n_proteins,-(-n_bytes//8)*8),dtype=np.uint8)
+    words[:,:n_bytes] = coverage
+    words = words.view(np.uint64)
+    no_covered = _popcount(words).sum(axis=1,dtype=np.int64)
+    intersection = np.empty((n_proteins,n_proteins),dtype=np.int64)
+    block = max(block_bytes//words[0].nbytes,1)
+    for i in range(n_proteins):
+        for start in range(i,n_proteins,block):
+            no_both = _popcount(words[start:start+block]&words[i]).sum(axis=1,dtype=np.int64)
+            intersection[i,start:start+block] = no_both
+            intersection[start:start+block,i] = no_both
+    if metric=='intersection':
+        overlap = intersection
+    else:
+        if metric=='jaccard':
+            denominator = no_covered[:,None]+no_covered[None,:]-intersection
+        else:
+            denominator = np.minimum(no_covered[:,None],no_covered[None,:])
+        #two proteins/polymers that cover no GW points count as identical
+        overlap = np.divide(intersection,denominator,out=np.ones((n_proteins,n_proteins)),where=denominator>0)
+    if labels is not None:
+        return pd.DataFrame(overlap,index=list(labels),columns=list(labels))
+    return overlap
+
+
+def conformation_rg2_ree2(positions):
+    #square of the radius of gyration and of the end-to-end distance of many conformations at once
+    #positions has shape (number of conformations, chain length, 3); same values as
+    #PyConforMap.Rgx2+Rgy2+Rgz2 and PyConforMap.Ree2 applied to each conformation
+    positions = np.asarray(positions,dtype=float)
+    centered = positions-positions.mean(axis=1,keepdims=True)
+    Rg2 = np.einsum('ijk,ijk->i',centered,centered)/positions.shape[1]
+    end_to_end = positions[:,-1,:]-positions[:,0,:]
+    Rend2 = np.einsum('ij,ij->i',end_to_end,end_to_end)
+    return Rg2,Rend2
+
+
+def _GW_batch(chain_length,nosnaps,mu,sigma,seed_seq):
+    #one batch of GW snapshots: gaussian steps along x, y and z, summed up from a first monomer at the origin
+    rng = np.random.default_rng(seed_seq)
+    positions = np.zeros((nosnaps,chain_length,3))
+    np.cumsum(rng.normal(mu,sigma,size=(nosnaps,chain_length-1,3)),axis=1,out=positions[:,1:,:])
+    return conformation_rg2_ree2(positions)
+
+
+def _GW_batches(chain_length,nosnaps,batch_size,seed_seq):
+    #arguments of _GW_batch for every batch of a simulation; they only depend on the seed and batch size
+    batch_sizes = [min(batch_size,nosnaps-start) for start in range(0,nosnaps,batch_size)]
+    return [(chain_length,n_batch,batch_seed) for n_batch,batch_seed in zip(batch_sizes,seed_seq.spawn(len(batch_sizes)))]
+
+
+def _run_GW_batches(batches,mu,sigma,workers):
+    #runs the batches in order, in this process (workers=1) or in a pool of worker processes
+    #(workers=None uses all cores); every batch has its own stream, so the result does not depend on workers
+    args = ([batch[0] for batch in batches],[batch[1] for batch in batches],[mu]*len(batches),
+            [sigma]*len(batches),[batch[2] for batch in batches])
+    if workers==1:
+        return list(map(_GW_batch,*args))
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_GW_batch,*args))
+
+
+def _as_seed_sequence(seed):
+    if isinstance(seed,np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def generate_GW_snapshots(chain_length,nosnaps,mu=0,sigma=1,seed=None,batch_size=GW_BATCH_SIZE,workers=1):
+    #returns the Rg2 and Rend2 arrays of nosnaps independent GW chain conformations
+    #the snapshots are generated batch_size at a time, each batch from its own stream spawned from
+    #np.random.SeedSequence(seed); seed=None gives a different simulation every time
+    #the batches can be spread over several processes (workers) without changing the result
+    results = _run_GW_batches(_GW_batches(chain_length,nosnaps,batch_size,_as_seed_sequence(seed)),
+                              mu,sigma,workers)
+    if not results:
+        return np.empty(0),np.empty(0)
+    return np.concatenate([Rg2 for Rg2,_ in results]),np.concatenate([Rend2 for _,Rend2 in results])
+
+
+def GW_dataframe(chain_length,Rg2,Rend2):
+    #the reference GW chain format: chain_length, Rg2, Rend2, Rg/Rg_mean and ratio columns
+    master_out=pd.DataFrame(np.array([Rg2,
+                       Rend2]).T,columns=['Rg2','Rend2'])
+    master_out.insert(0,'chain_length',np.repeat(chain_length,len(Rg2)))
+    rg_val = np.array(master_out.Rg2)**0.5
+    rg_mean = np.mean(rg_val)
+    master_out['Rg/Rg_mean'] = rg_val/rg_mean
+    master_out['ratio'] = master_out['Rend2'].values/master_out['Rg2'].values
+    return master_out
+
+
+def build_GW_references(chain_lengths,nosnaps,mu=0,sigma=1,seed=None,batch_size=GW_BATCH_SIZE,workers=None,
+                        save_dir=None,file_format='csv'):
+    #simulates one GW reference chain per chain length (e.g. one per protein residue count) in parallel
+    #every chain length gets its own stream spawned from np.random.SeedSequence(seed), and the batches of all
+    #chain lengths are spread over one pool of worker processes (workers=None uses all cores); the result
+    #is the same for any number of workers
+    #returns a dictionary {chain length: GW dataframe}; with save_dir, each reference is also written there
+    #as GW_chainlen<chain length>.csv (file_format='csv') or .gwref (file_format='binary'), ready for
+    #PyConforMap(..., GW_file=...) or load_GW_chain
+    chain_seeds = _as_seed_sequence(seed).spawn(len(chain_lengths))
+    batches = [_GW_batches(chain_length,nosnaps,batch_size,chain_seed)
+               for chain_length,chain_seed in zip(chain_lengths,chain_seeds)]
+    results = _run_GW_batches(list(chain.from_iterable(batches)),mu,sigma,workers)
+
+    GW_references = {}
+    start = 0
+    for chain_length,chain_batches in zip(chain_lengths,batches):
+        chain_results = results[start:start+len(chain_batches)]
+        start += len(chain_batches)
+        GW_df = GW_dataframe(chain_length,np.concatenate([Rg2 for Rg2,_ in chain_results]),
+                             np.concatenate([Rend2 for _,Rend2 in chain_results]))
+        GW_references[chain_length] = GW_df
+        if save_dir is not None:
+            if file_format=='csv':
+                GW_df.to_csv(os.path.join(save_dir,f'GW_chainlen{chain_length}.csv'),index=False)
+            elif file_format=='binary':
+                save_GW_reference_binary(GWReference(GW_df),os.path.join(save_dir,f'GW_chainlen{chain_length}.gwref'))
+            else:
+                raise ValueError("file_format must be 'csv' or 'binary'")
+    return GW_references
+
+
+def save_GW_reference_binary(reference,direc_and_filename):
+    #writes a GWReference to a binary file that read_GW_reference_binary opens with np.memmap
+    #layout: GW_BINARY_MAGIC, header length (little-endian uint64), JSON header, then two float64 blocks,
+    #each starting at a multiple of GW_BINARY_ALIGN bytes:
+    #   columns block of shape (number of GW_df columns, n), i.e. one contiguous array per column
+    #   points block of shape (n,2), the transformed GW coordinates, ready to be used by a KD-tree
+    columns = list(reference.GW_df.columns)
+    n_GW = reference.GW_df.shape[0]
+    header = {'columns':columns,'n_snapshots':n_GW,'dtype':'<f8',
+              'GW_mean':reference.GW_mean.tolist(),'GW_std':reference.GW_std.tolist()}
+    with open(direc_and_filename,'wb') as f:
+        _write_GW_binary_header(f,header)
+        np.ascontiguousarray(reference.GW_df.values.T,dtype='<f8').tofile(f)
+        f.write(bytes(header['points_offset']-f.tell()))
+        np.ascontiguousarray(reference.GW_points,dtype='<f8').tofile(f)
+
+
+def _write_GW_binary_header(f,header):
+    #writes GW_BINARY_MAGIC, the header length and the JSON header, after adding the block offsets to the header
+    #the offsets depend on the header length, so the header is padded to a fixed size first
+    header_bytes = json.dumps(header).encode()
+    header_size = -(-(len(GW_BINARY_MAGIC)+8+len(header_bytes)+64)//GW_BINARY_ALIGN)*GW_BINARY_ALIGN
+    header['columns_offset'] = header_size
+    header['points_offset'] = header_size+(-(-len(header['columns'])*header['n_snapshots']*8//GW_BINARY_ALIGN))*GW_BINARY_ALIGN
+    header_bytes = json.dumps(header).encode().ljust(header_size-len(GW_BINARY_MAGIC)-8)
+    f.write(GW_BINARY_MAGIC)
+    f.write(np.uint64(len(header_bytes)).astype('<u8').tobytes())
+    f.write(header_bytes)
+
+
+def read_GW_reference_binary(direc_and_filename):
+    #opens a file written by save_GW_reference_binary without parsing or copying the data
+    #the data is memory-mapped read-only, so processes opening the same file share one page-cached copy
+    with open(direc_and_filename,'rb') as f:
+        if f.read(len(GW_BINARY_MAGIC))!=GW_BINARY_MAGIC:
+            raise ValueError(f'{direc_and_filename} is not a binary GW reference file')
+        header_length = int(np.frombuffer(f.read(8),dtype='<u8')[0])
+        header = json.loads(f.read(header_length))
+    n_GW = header['n_snapshots']
+    columns = np.memmap(direc_and_filename,dtype=header['dtype'],mode='r',
+                        offset=header['columns_offset'],shape=(len(header['columns']),n_GW))
+    GW_points = np.memmap(direc_and_filename,dtype=header['dtype'],mode='r',
+                          offset=header['points_offset'],shape=(n_GW,2))
+    #copy=False keeps the dataframe columns as views of the memory-mapped file
+    GW_df = pd.DataFrame(columns.T,columns=header['columns'],copy=False)
+    reference = GWReference(GW_df,GW_mean=header['GW_mean'],GW_std=header['GW_std'],GW_points=GW_points)
+    reference.tiles = header.get('tiles')
+    return reference
+
+
+def _tile_index(GW_points,tiles):
+    #tile of every transformed GW point, numbered row by row (x tile * number of y tiles + y tile)
+    tile_xy = np.floor((GW_points-tiles['origin'])/tiles['size']).astype(np.int64)
+    tile_xy = np.clip(tile_xy,0,np.array(tiles['shape'])-1)
+    return tile_xy[:,0]*tiles['shape'][1]+tile_xy[:,1]
+
+
+def tile_GW_reference(reference,direc_and_filename,tile_size=GW_TILE_SIZE,chunksize=GW_TILE_CHUNK_SIZE):
+    #writes a copy of a GW reference whose snapshots are grouped by square tiles of the transformed plane
+    #(Rg/Rg_mean, ratio), for tiled_score_protein; the file has the binary layout of save_GW_reference_binary
+    #(so it can be used anywhere a binary reference can) plus the tile layout in the header, and the points of
+    #every tile are stored contiguously, so one tile is read from disk with a single slice
+    #reference is a GWReference or a GW reference file; a binary file is read through np.memmap and the copy is
+    #written through np.memmap, chunksize snapshots at a time, so neither has to fit in memory
+    #the snapshots are reordered, so GW prefixes (GW_every_ith_snap) of the tiled file are not those of the original
+    if not isinstance(reference,GWReference):
+        reference = load_GW_reference(reference)
+    columns = list(reference.GW_df.columns)
+    n_GW = reference.GW_points.shape[0]
+    chunks = [slice(start,min(start+chunksize,n_GW)) for start in range(0,n_GW,chunksize)]
+
+    #first pass: extent of the transformed points, which sets the tile grid
+    lowest = np.min([np.min(reference.GW_points[chunk],axis=0) for chunk in chunks],axis=0)
+    highest = np.max([np.max(reference.GW_points[chunk],axis=0) for chunk in chunks],axis=0)
+    tiles = {'size':tile_size,'origin':lowest.tolist(),
+             'shape':(np.floor((highest-lowest)/tile_size).astype(int)+1).tolist()}
+    #second pass: number of points per tile, which sets where every tile starts in the file
+    no_points = np.zeros(tiles['shape'][0]*tiles['shape'][1],dtype=np.int64)
+    for chunk in chunks:
+        no_points += np.bincount(_tile_index(reference.GW_points[chunk],tiles),minlength=no_points.shape[0])
+    tile_starts = np.concatenate([[0],np.cumsum(no_points)])
+    tiles['starts'] = tile_starts.tolist()
+
+    header = {'columns':columns,'n_snapshots':n_GW,'dtype':'<f8',
+              'GW_mean':reference.GW_mean.tolist(),'GW_std':reference.GW_std.tolist(),'tiles':tiles}
+    with open(direc_and_filename,'wb') as f:
+        _write_GW_binary_header(f,header)
+        f.truncate(header['points_offset']+n_GW*2*8)
+    out_columns = np.memmap(direc_and_filename,dtype='<f8',mode='r+',offset=header['columns_offset'],
+                            shape=(len(columns),n_GW))
+    out_points = np.memmap(direc_and_filename,dtype='<f8',mode='r+',offset=header['points_offset'],shape=(n_GW,2))
+
+    #third pass: every snapshot goes to the next free position of its tile, keeping the original order within a tile
+    no_written = np.zeros_like(no_points)
+    for chunk in chunks:
+        tile = _tile_index(reference.GW_points[chunk],tiles)
+        order = np.argsort(tile,kind='stable')
+        sorted_tile = tile[order]
+        rank_in_chunk = np.arange(order.shape[0])-np.searchsorted(sorted_tile,sorted_tile)
+        position = tile_starts[sorted_tile]+no_written[sorted_tile]+rank_in_chunk
+        no_written += np.bincount(tile,minlength=no_written.shape[0])
+        out_points[position] = reference.GW_points[chunk][order]
+        for i,column in enumerate(columns):
+            out_columns[i,position] = reference.GW_df[column].values[chunk][order]
+    out_columns.flush()
+    out_points.flush()
+    del out_columns,out_points
+
+
+class GWCoverageAccumulator():
+
+    """
+     Running fC over protein/polymer snapshots that arrive in chunks. The GW neighbors of each new chunk are
+     searched in the GW tree, WINDOW_QUERY_BLOCK snapshots at a time, and a boolean GW-coverage array is
+     updated in place, so a few frames from a running simulation cost time proportional to their own GW
+     neighbors. For large chunks, whose neighbors far outnumber the GW points not covered yet
+     (COVERAGE_SEARCH_RATIO), only the uncovered GW points are searched against a KD-tree of the rest of the
+     chunk instead. The fC after any number of chunks is exact either way, and memory use only depends on the
+     block, chunk and GW sizes. Chunks can come from memory, a csv file or a running simulation.
+
+    ...
+
+    Attributes
+    ----------
+    covered : boolean array
+        One entry per GW point, True once at least one protein/polymer snapshot has been within the radius
+        
+    n_covered : int
+        Number of covered GW points
+        
+    n_snapshots : int
+        Number of protein/polymer snapshots added so far
+        
+    fC : float
+        Fraction of GW points covered so far
+        
+    Methods
+    -------
+    add_snapshots
+        - add a chunk of protein/polymer Rg2 and Ree2 values
+        
+    add_points
+        - add a chunk of already transformed protein/polymer coordinates
+        
+    add_snapshots_from_csv
+        - add the snapshots of a csv file chunk by chunk, yielding fC after every chunk
+
+    coverage_bitset
+        - the covered GW points packed into bits
+        
+    """
+
+    def __init__(self,tree_GW,n_GW,protein_rg_mean,GW_mean,GW_std,radius_,workers=-1):
+        self.tree_GW = tree_GW
+        self.workers = workers
+        self.protein_rg_mean = protein_rg_mean
+        self.GW_mean = np.asarray(GW_mean)
+        self.GW_std = np.asarray(GW_std)
+        self.radius_ = radius_
+        #the GW points the tree was built from (not a copy)
+        self.GW_points = tree_GW.data[:n_GW]
+        self.covered = np.zeros(n_GW,dtype=bool)
+        self.n_covered = 0
+        self.n_snapshots = 0
+        #snapshots searched in the GW tree so far and their GW neighbors, to estimate those of a new chunk
+        self._no_searched = 0
+        self._no_neighbors = 0
+        
+    @property
+    def fC(self):
+        return self.n_covered/self.covered.shape[0]
+        
+    def add_snapshots(self,rg2,ree2):
+        #same transformation as PyConforMap.organize_data, with the fixed protein/polymer Rg_mean
+        return self.add_points(transform_protein_data(rg2,ree2,self.protein_rg_mean,self.GW_mean,self.GW_std))
+        
+    def add_points(self,points):
+        points = np.asarray(points)
+        self.n_snapshots += points.shape[0]
+        if points.shape[0]==0:
+            return self.fC
+        #the GW neighbors of the chunk are searched WINDOW_QUERY_BLOCK snapshots at a time, which bounds the
+        #memory used by the python lists; the neighbors found so far (in this and earlier chunks) estimate
+        #those of the rest of the chunk
+        for start in range(0,points.shape[0],WINDOW_QUERY_BLOCK):
+            no_uncovered = self.covered.shape[0]-self.n_covered
+            if no_uncovered==0:
+                break
+            if self._no_neighbors*(points.shape[0]-start)>COVERAGE_SEARCH_RATIO*no_uncovered*self._no_searched:
+                #only the GW points that are still uncovered can change, so only they are searched, against a
+                #tree of the rest of the chunk (one nearest-neighbor search each, see points_within_radius)
+                uncovered = np.flatnonzero(~self.covered)
+                self._cover(uncovered[points_within_radius(spatial.cKDTree(points[start:]),
+                                                           self.GW_points[uncovered],self.radius_,
+                                                           workers=self.workers)])
+                break
+            neighbors = self.tree_GW.query_ball_point(points[start:start+WINDOW_QUERY_BLOCK],self.radius_,
+                                                      workers=self.workers,return_sorted=False)
+            GW_indx = np.fromiter(chain.from_iterable(neighbors),dtype=np.intp)
+            self._no_searched += len(neighbors)
+            self._no_neighbors += GW_indx.shape[0]
+            self._cover(np.unique(GW_indx[~self.covered[GW_indx]]))
+        return self.fC
+        
+    def _cover(self,newly_covered):
+        #marks GW points that were not covered yet (each index once) as covered
+        self.covered[newly_covered] = True
+        self.n_covered += newly_covered.shape[0]
+        
+    def coverage_bitset(self):
+        #the covered array packed into bits with np.packbits (see landscape_overlap)
+        return np.packbits(self.covered)
+        
+    def add_snapshots_from_csv(self,csv_file,chunksize=10000):
+        #the csv file has the same layout as the PyConforMap input (Rg2 first column, Ree2 second column)
+        #yields (number of snapshots so far, fC so far) after every chunk
+        for chunk in pd.read_csv(csv_file,chunksize=chunksize):
+            self.add_snapshots(chunk.iloc[:,0].values,chunk.iloc[:,1].values)
+            yield self.n_snapshots, self.fC
+
+
+class GWWindowCoverage():
+
+    """
+     fC of a sliding window over protein/polymer snapshots, i.e. of the last `window` snapshots added.
+     For every GW point the number of snapshots in the window that are within the radius of it is kept.
+     A snapshot entering the window increments the counts of its GW neighbors and a snapshot leaving it
+     decrements them, and a GW point is covered while its count is above zero. Moving the window therefore
+     costs time proportional to the GW neighbors of the snapshots that entered and left, not to the
+     window or GW size. Only the coordinates of the snapshots in the window are kept; the GW neighbors of a
+     snapshot are searched again when it leaves the window, WINDOW_QUERY_BLOCK snapshots at a time whatever
+     the step, so memory use does not grow with the window's neighbors or with the step.
+
+    ...
+
+    Attributes
+    ----------
+    window : int
+        Number of most recent protein/polymer snapshots that make up the window
+        
+    counts : int array
+        One entry per GW point, the number of snapshots in the window within the radius of it
+        
+    n_covered : int
+        Number of GW points covered by the window
+        
+    n_snapshots : int
+        Number of protein/polymer snapshots added so far (the window holds the last min(window, n_snapshots))
+        
+    fC : float
+        Fraction of GW points covered by the window
+        
+    Methods
+    -------
+    add_snapshots
+        - add a chunk of protein/polymer Rg2 and Ree2 values
+        
+    add_points
+        - add a chunk of already transformed protein/polymer coordinates
+        
+    slide_points
+        - add already transformed coordinates step snapshots at a time, yielding fC after every step
+        
+    """
+
+    def __init__(self,tree_GW,n_GW,window,protein_rg_mean,GW_mean,GW_std,radius_,workers=-1):
+        if window<1:
+            raise ValueError('window must be at least 1 snapshot')
+        self.tree_GW = tree_GW
+        self.workers = workers
+        self.window = int(window)
+        self.protein_rg_mean = protein_rg_mean
+        self.GW_mean = np.asarray(GW_mean)
+        self.GW_std = np.asarray(GW_std)
+        self.radius_ = radius_
+        self.counts = np.zeros(n_GW,dtype=np.int32)
+        self.n_covered = 0
+        self.n_snapshots = 0
+        #transformed coordinates of the snapshots in the window, oldest first, as blocks of consecutive snapshots;
+        #the GW neighbors of the snapshots leaving the window are searched again rather than kept, so memory
+        #use is bounded by the window's coordinates and one block of neighbors
+        self._window_points = deque()
+        self._n_window = 0
+        
+    @property
+    def fC(self):
+        return self.n_covered/self.counts.shape[0]
+        
+    @property
+    def covered(self):
+        return self.counts>0
+        
+    def add_snapshots(self,rg2,ree2):
+        #same transformation as PyConforMap.organize_data, with the fixed protein/polymer Rg_mean
+        return self.add_points(transform_protein_data(rg2,ree2,self.protein_rg_mean,self.GW_mean,self.GW_std))
+        
+    def add_points(self,points):
+        #adds the whole chunk at once and returns the fC of the window after it
+        for _ in self.slide_points(points,step=max(len(points),1)):
+            pass
+        return self.fC
+        
+    def slide_points(self,points,step=1):
+        #adds the points step snapshots at a time and yields (number of snapshots so far, fC of the window)
+        #after every step (and after a last, incomplete step)
+        #the points are taken WINDOW_QUERY_BLOCK at a time, whatever the step: the GW neighbors of the block and
+        #of the snapshots leaving the window while the block enters it are searched, and the counts are then
+        #updated step by step within the block
+        points = np.asarray(points)
+        no_pending = 0
+        for start in range(0,points.shape[0],WINDOW_QUERY_BLOCK):
+            block = points[start:start+WINDOW_QUERY_BLOCK]
+            entering = self._neighbors(block)
+            #with a block longer than the window, some of its own snapshots leave the window as well
+            self._window_points.append(block)
+            leaving = self._neighbors(self._pop_oldest(max(self._n_window+block.shape[0]-self.window,0)))
+            i = 0
+            while i<len(entering):
+                #snapshots up to the end of the current step or of the block
+                no_entering = min(step-no_pending,len(entering)-i)
+                self._update_counts(entering[i:i+no_entering],1)
+                no_leaving = max(self._n_window+no_entering-self.window,0)
+                self._update_counts(leaving[:no_leaving],-1)
+                leaving = leaving[no_leaving:]
+                self._n_window += no_entering-no_leaving
+                self.n_snapshots += no_entering
+                no_pending += no_entering
+                i += no_entering
+                if no_pending==step:
+                    no_pending = 0
+                    yield self.n_snapshots, self.fC
+        if no_pending>0:
+            yield self.n_snapshots, self.fC
+                
+    def _neighbors(self,points):
+        #GW neighbor indices of every point (at most WINDOW_QUERY_BLOCK points)
+        if points.shape[0]==0:
+            return []
+        neighbors = self.tree_GW.query_ball_point(points,self.radius_,workers=self.workers,return_sorted=False)
+        return [np.asarray(GW_indx,dtype=np.intp) for GW_indx in neighbors]
+        
+    def _pop_oldest(self,no_snapshots):
+        #removes the coordinates of the no_snapshots oldest snapshots of the window and returns them
+        oldest = []
+        while no_snapshots>0:
+            block = self._window_points[0]
+            if block.shape[0]<=no_snapshots:
+                oldest.append(self._window_points.popleft())
+            else:
+                oldest.append(block[:no_snapshots])
+                self._window_points[0] = block[no_snapshots:]
+            no_snapshots -= oldest[-1].shape[0]
+        return np.concatenate(oldest) if oldest else np.zeros((0,2))
+        
+    def _update_counts(self,snapshot_neighbors,sign):
+        #the GW neighbors of one snapshot are distinct; for several snapshots a GW point can appear more than
+        #once, so the number of snapshots per GW point is counted first
+        if len(snapshot_neighbors)==0:
+            return
+        if len(snapshot_neighbors)==1:
+            GW_indx,no_snapshots = snapshot_neighbors[0],1
+        else:
+            GW_indx,no_snapshots = np.unique(np.concatenate(snapshot_neighbors),return_counts=True)
+        old_counts = self.counts[GW_indx]
+        new_counts = old_counts+sign*no_snapshots
+        self.counts[GW_indx] = new_counts
+        #GW points whose count went from zero to above zero (entering) or from above zero to zero (leaving)
+        if sign>0:
+            self.n_covered += int(np.count_nonzero(old_counts==0))
+        else:
+            self.n_covered -= int(np.count_nonzero(new_counts==0))
+
+
+def result_cache_key(*parts):
+    #sha256 hex digest of arrays (dtype, shape and data), numbers, strings, None and tuples/lists of them
+    digest = hashlib.sha256(str(RESULT_CACHE_VERSION).encode())
+    def add(part):
+        if isinstance(part,np.ndarray):
+            digest.update(f'array{part.dtype.str}{part.shape}'.encode())
+            digest.update(np.ascontiguousarray(part).data)
+        elif isinstance(part,(tuple,list)):
+            digest.update(f'sequence{len(part)}'.encode())
+            for item in part:
+                add(item)
+        else:
+            if isinstance(part,np.generic):
+                part = part.item()
+            digest.update(f'{type(part).__name__}:{part!r};'.encode())
+    for part in parts:
+        add(part)
+    return digest.hexdigest()
+
+
+class ResultCache():
+
+    """
+     On-disk cache of computed results, addressed by content: the key of a result is a hash of everything it
+     depends on (see result_cache_key), so results are reused as long as their inputs are unchanged and a
+     changed input simply gives a new key. Every entry is one .npz file in the cache directory, written to a
+     temporary file and moved into place with os.replace, so processes sharing the directory never read a
+     partly written entry. Reading an entry marks it as recently used, and the least recently used entries are
+     deleted once the entries take more than max_bytes.
+
+    ...
+
+    Attributes
+    ----------
+    directory : string
+        The cache directory (created if needed)
+        
+    max_bytes : int
+        Largest total size of the entries, RESULT_CACHE_SIZE by default
+        
+    Methods
+    -------
+    get_or_compute
+        - the stored result of a key, or the result of a function, which is then stored
+        
+    load
+        - the stored result of a key, or None
+        
+    store
+        - stores a result (a dictionary of arrays/numbers) under a key
+        
+    clear
+        - deletes every entry
+        
+    """
+
+    def __init__(self,directory,max_bytes=RESULT_CACHE_SIZE):
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory,exist_ok=True)
+        
+    def _path(self,key):
+        return os.path.join(self.directory,key+'.npz')
+        
+    def get_or_compute(self,key,compute):
+        values = self.load(key)
+        if values is None:
+            values = compute()
+            self.store(key,values)
+        return values
+        
+    def load(self,key):
+        path = self._path(key)
+        try:
+            with np.load(path,allow_pickle=False) as entry:
+                values = {name:entry[name] for name in entry.files}
+            #the modification time records the last use, for the eviction order
+            os.utime(path)
+        except (OSError,ValueError,EOFError,zipfile.BadZipFile):
+            #missing, just deleted by another process, or unreadable: computed again
+            return None
+        return values
+        
+    def store(self,key,values):
+        file_descriptor,temporary_path = tempfile.mkstemp(dir=self.directory,suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor,'wb') as f:
+                np.savez(f,**{name:np.asarray(value) for name,value in values.items()})
+            os.replace(temporary_path,self._path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        self._evict()
+        
+    def _entries(self):
+        #(last use, size, path) of every entry, skipping entries deleted by another process meanwhile
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                try:
+                    entry_stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry_stat.st_mtime_ns,entry_stat.st_size,entry.path))
+        return entries
+        
+    def _evict(self):
+        entries = sorted(self._entries())
+        total_bytes = sum(size for _,size,_ in entries)
+        for _,size,path in entries:
+            if total_bytes<=self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+            
+    def clear(self):
+        for _,_,path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def main(argv=None):
+    #headless command-line entry point, e.g.
+    #   python pyconformap.py protein1.csv protein2.npy --GW-file GW_chainlen100.gwref -o results.csv
+    #loads the GW reference, scores the proteins/polymers with score_proteins and writes the results as
+    #JSON (standard output by default, or a .json file) or csv; matplotlib is never imported
+    import argparse
+    parser = argparse.ArgumentParser(description='score proteins/polymers (fC and bounded fraction) against a GW reference')
+    parser.add_argument('proteins',nargs='+',
+                        help='csv files (Rg2 and Ree2 columns) or .npy files (Rg2 and Ree2 columns, or per-frame coordinates)')
+    parser.add_argument('--GW-file',default=DEFAULT_GW_FILE,help='GW reference, csv or binary (default: %(default)s)')
+    parser.add_argument('--radius',type=float,default=0.1,help='radius_ (default: %(default)s)')
+    parser.add_argument('--GW-snapshots',type=int,default=None,help='number of GW snapshots to use (default: all)')
+    parser.add_argument('--workers',type=int,default=None,
+                        help='number of worker processes (default: all cores, or 1 for a single protein)')
+    parser.add_argument('--chunksize',type=int,default=None,help='read every protein this many snapshots at a time')
+    parser.add_argument('-o','--output',default='-',help='results file, .csv or .json (default: JSON to standard output)')
+    parser.add_argument('--bootstrap',type=int,default=0,
+                        help='number of block-bootstrap replicates for fC confidence intervals (default: none)')
+    parser.add_argument('--seed',type=int,default=None,help='seed of the bootstrap replicates')
+    parser.add_argument('--coverage',default=None,
+                        help='also save the packed GW coverage of every protein (one row each) to this .npy file')
+    args = parser.parse_args(argv)
+
+    workers = args.workers
+    if workers is None and len(args.proteins)==1:
+        workers = 1
+    results = score_proteins(args.proteins,radius_=args.radius,GW_file=args.GW_file,GW_every_ith_snap=args.GW_snapshots,
+                             workers=workers,chunksize=args.chunksize,return_coverage=args.coverage is not None,
+                             bootstrap=args.bootstrap,seed=args.seed)
+    if args.coverage is not None:
+        results,coverage = results
+        np.save(args.coverage,coverage)
+    if args.output.endswith('.csv'):
+        results.to_csv(args.output,index=False)
+    elif args.output=='-':
+        sys.stdout.write(results.to_json(orient='records',indent=1,double_precision=15)+'\n')
+    else:
+        with open(args.output,'w') as f:
+            f.write(results.to_json(orient='records',indent=1,double_precision=15)+'\n')
+
+
+if __name__=='__main__':
+    main()